@@ -3,7 +3,8 @@ import time
 import bpy
 from . import operators
 from .core import menus, preferences, ui, keymap
-from .utils import perforce, message
+from .utils import perforce, message, dirty
+from .utils.log import logger
 from inspect import isclass
 from bpy.app.handlers import persistent
 
@@ -31,14 +32,36 @@ REGISTER_CLASSES = (
 )
 
 
+__register_time__ = None
+
+def get_register_time():
+    """Seconds the last addon registration took."""
+    return __register_time__
+
 def register():
     """Register all of the Addon classes."""
+    global __register_time__
+    start_time = time.perf_counter()
     register_recursive(REGISTER_CLASSES)
     bpy.app.handlers.load_post.append(check_for_p4)
     bpy.app.handlers.save_post.append(check_for_p4)
+    bpy.app.handlers.load_post.append(dirty.on_load)
+    bpy.app.handlers.save_pre.append(dirty.export_dirty_on_save)
+    bpy.app.handlers.depsgraph_update_post.append(dirty.on_depsgraph_update)
+    __register_time__ = time.perf_counter() - start_time
+    logger.debug("EZ-UE4 Tools registered in %.1f ms", __register_time__ * 1000.0)
 
 def unregister():
     """Unregister all of the Addon classes."""
+    for handlers, handler in (
+        (bpy.app.handlers.load_post, check_for_p4),
+        (bpy.app.handlers.save_post, check_for_p4),
+        (bpy.app.handlers.load_post, dirty.on_load),
+        (bpy.app.handlers.save_pre, dirty.export_dirty_on_save),
+        (bpy.app.handlers.depsgraph_update_post, dirty.on_depsgraph_update),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
     unregister_recursive(REGISTER_CLASSES)
 
 def register_recursive(objects):
@@ -51,7 +74,7 @@ def register_recursive(objects):
         elif hasattr(obj, "REGISTER_CLASSES"):
             register_recursive(obj.REGISTER_CLASSES)
         else:
-            print(f"Warning: Failed to find anything to register for '{obj}'")
+            logger.warning("Failed to find anything to register for '%s'", obj)
 
 def unregister_recursive(objects):
     """Unregisters classes from Blender recursively from modules."""
@@ -63,7 +86,7 @@ def unregister_recursive(objects):
         elif hasattr(obj, "REGISTER_CLASSES"):
             unregister_recursive(obj.REGISTER_CLASSES)
         else:
-            print(f"Warning: Failed to find anything to unregister for '{obj}'")
+            logger.warning("Failed to find anything to unregister for '%s'", obj)
 
 
 @persistent
@@ -0,0 +1,84 @@
+""" Microbenchmarks of the export planner (utils/planner.py) on generated scenes, runs without Blender
+
+usage: python benchmarks/bench_planner.py [collection counts...]
+"""
+import importlib.util
+import os
+import sys
+import timeit
+
+REPEAT = 5
+DEFAULT_SIZES = (1000, 10000, 50000)
+
+
+def load_planner():
+    """ Loads the planner by path (the addon package itself needs bpy) """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "planner.py")
+    spec = importlib.util.spec_from_file_location("planner", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+planner = load_planner()
+
+
+def create_scene(count):
+    """ Export collections (every 3rd HP, every 5th LP, every 7th auto uv, every 10th with children) and all collection names """
+    settings = planner.PlanSettings(project_name="bench")
+    collections = []
+    names = set()
+    for i in range(count):
+        name = settings.export_prefix + (settings.autouv_prefix if i % 7 == 0 else "") + f"Asset{i:06d}"
+        if i % 3 == 0:
+            name += "_HP"
+        elif i % 5 == 0:
+            name += "_LP"
+        children = tuple(f"Asset{i:06d}_Part{j}" for j in range(3)) if i % 10 == 0 else ()
+        collections.append(planner.CollectionInfo(name, children, excluded=i % 11 == 0, dirty=i % 2 == 0))
+        names.add(name)
+        names.update(children)
+        if i % 4 == 0:
+            names.add(planner.get_ucx_collection_name(name, settings))
+    return settings, collections, names
+
+def find_ucx_by_scan(collections, names, settings):
+    """ UCX matching as done before the planner (scan of all ucx collections per collection) """
+    ucx_names = [name for name in names if name.startswith(settings.collision_prefix)]
+    matches = {}
+    for collection in collections:
+        clean_name = collection.name.removeprefix(settings.export_prefix)
+        for ucx_name in ucx_names:
+            if ucx_name.removeprefix(settings.collision_prefix) == clean_name:
+                matches[collection.name] = ucx_name
+                break
+    return matches
+
+def measure(function, number=1):
+    """ Best time of REPEAT runs in ms """
+    return min(timeit.repeat(function, number=number, repeat=REPEAT)) / number * 1000.0
+
+def run(count):
+    settings, collections, names = create_scene(count)
+    only_dirty = settings._replace(only_dirty=True, export_hp=False)
+    armature_names = [collection.name for collection in collections]
+
+    results = [
+        ("filter", measure(lambda: planner.filter_collections(collections, settings))),
+        ("filter (dirty, no HP)", measure(lambda: planner.filter_collections(collections, only_dirty))),
+        ("plan collections", measure(lambda: planner.plan_collections(collections, names, settings))),
+        ("plan armatures", measure(lambda: planner.plan_armatures(armature_names, settings))),
+        ("export names", measure(lambda: [planner.get_export_name(c.name, settings) for c in collections])),
+    ]
+    # quadratic, only measured on smaller scenes
+    if count <= 10000:
+        results.append(("ucx scan (old)", measure(lambda: find_ucx_by_scan(collections, names, settings))))
+    return results
+
+def main(sizes):
+    print(f"{'collections':>12}  {'benchmark':<24}{'ms':>10}{'us/collection':>16}")
+    for count in sizes:
+        for label, ms in run(count):
+            print(f"{count:>12}  {label:<24}{ms:>10.2f}{ms * 1000.0 / count:>16.3f}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
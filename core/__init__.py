@@ -21,20 +21,36 @@ def find_exportable_armatures():
             export_armatures.append(armature)
     return export_armatures
 
+def get_plan_settings(**options):
+    """Export planner settings from the preferences (options are the filters of the operator)"""
+    from . import preferences
+    from ..utils import addon, planner
+    return planner.PlanSettings(
+        export_prefix=preferences.export_prefix(),
+        collision_prefix=preferences.collision_prefix(),
+        autouv_prefix=preferences.autouv_prefix(),
+        lowpoly_regex=preferences.lowpoly_regex(),
+        highpoly_regex=preferences.highpoly_regex(),
+        collection_name_template=preferences.collection_export_name_template(),
+        armature_name_template=preferences.armature_export_name_template(),
+        project_name=addon.get_project_name(),
+        **options,
+    )
+
 def unselect_unwanted_objects_for_export():
     """Excludes unwanted objects from the selection"""
     from . import preferences
-    for obj in bpy.context.selected_objects:
+    for obj in objects.get_selected():
         if obj.name.startswith(preferences.export_exclude_object_prefix()):
             objects.remove_from_selection(obj)
 
 def set_selection_priority_object_as_active():
     """Selects the first or marked object of the selected objects as active"""
     from . import preferences
-    if not bpy.context.selected_objects:
+    if not objects.get_selected():
         return
-    for obj in bpy.context.selected_objects:
+    for obj in objects.get_selected():
         if obj.name.startswith(preferences.export_priority_object_prefix()):
             objects.set_active(obj)
             return
-    objects.set_active(bpy.context.selected_objects[0])
\ No newline at end of file
+    objects.set_active(objects.get_selected()[0])
\ No newline at end of file
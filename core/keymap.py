@@ -15,6 +15,9 @@ def register():
     """Load keymaps"""
     # handle the keymap
     wm = bpy.context.window_manager
+    # there are no addon keyconfigs in background mode (eg. on build nodes)
+    if not wm.keyconfigs.addon:
+        return
     km = wm.keyconfigs.addon.keymaps.new(name='Window', space_type='EMPTY')
 
     kmi = km.keymap_items.new('wm.call_menu_pie', 'W', 'PRESS', ctrl=True, shift=True, alt=True)
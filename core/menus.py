@@ -3,6 +3,7 @@
 import bpy
 from .ui import menu_draw
 from .. import operators
+from ..utils.log import logger
 from . import find_exportable_armatures, find_exportable_collections
 
 
@@ -34,7 +35,7 @@ class MenuBuilder():
             elif getattr(item, 'menu_draw', None) is not None:
                 self._menu.append(item.menu_draw)
             else:
-                print(f"Warning: {item} has been added to a menu, but has no 'menu_draw' method!")
+                logger.warning("%s has been added to a menu, but has no 'menu_draw' method!", item)
 
     def unregister(self):
         """Unregister the operators from the menu."""
@@ -4,6 +4,7 @@ from os import environ, path
 from bpy.props import BoolProperty, StringProperty, EnumProperty
 from bpy.types import AddonPreferences
 from ..utils import addon
+from ..utils.log import logger
 from os.path import normpath
 from pathlib import Path
 
@@ -63,6 +64,26 @@ def perforce_enabled():
     """If p4 is enabled"""
     return __preferences().perforce_enabled
 
+def export_on_save():
+    """If modified collections and armatures are exported on save"""
+    return __preferences().export_on_save
+
+def verbose_logging():
+    """If debug output of the exporters is logged"""
+    return __preferences().verbose_logging
+
+def export_budgets():
+    """Per prefix triangle and size budgets ('prefix:triangles:megabytes;...')"""
+    return __preferences().export_budgets
+
+def over_budget_action():
+    """If assets over budget are exported with a warning ('WARN') or not at all ('REFUSE')"""
+    return __preferences().over_budget_action
+
+def unreal_content_path():
+    """Unreal content folder the exported assets are imported to"""
+    return __preferences().unreal_content_path.rstrip("/")
+
 
 class EZUE4AddonPreferences(AddonPreferences):
     """Preferences class for the Addon"""
@@ -81,7 +102,7 @@ class EZUE4AddonPreferences(AddonPreferences):
         elif path.exists(self.source_path):
             self.stored_source_path = self.source_path
         else:
-            print(f"Error: Path does not exist: '{self.source_path}'")
+            logger.error("Path does not exist: '%s'", self.source_path)
             if self.stored_source_path and path.exists(self.stored_source_path):
                 self.source_path = self.stored_source_path
 
@@ -175,6 +196,42 @@ class EZUE4AddonPreferences(AddonPreferences):
         default=True,
     )
 
+    export_on_save: BoolProperty(
+        name="Export on save",
+        description="If enabled, collections and armatures modified since their last export are exported after saving",
+        default=False,
+    )
+
+    verbose_logging: BoolProperty(
+        name="Verbose logging",
+        description="If enabled, the exporters log debug output (eg. every object checked)",
+        default=False,
+    )
+
+    export_budgets: StringProperty(
+        name="Budgets",
+        description="Per prefix budgets as 'prefix:triangles:megabytes' separated by ';' (eg. 'SM_:50000:10;Prop_:5000:'), the longest matching prefix is used",
+        default= "",
+        subtype='NONE'
+    )
+
+    over_budget_action: EnumProperty(
+        name="Over budget",
+        description="What the exporters do with assets over budget",
+        items=(
+            ('WARN', "Warn", "Export with a warning"),
+            ('REFUSE', "Refuse", "Do not export"),
+        ),
+        default='WARN',
+    )
+
+    unreal_content_path: StringProperty(
+        name="Unreal content path",
+        description="Content folder the generated reimport script imports the exported assets to",
+        default= "/Game",
+        subtype='NONE'
+    )
+
     def draw(self, context):
         """Draws the preferences."""
         self.layout.prop(self, 'source_path', expand=True)
@@ -185,6 +242,9 @@ class EZUE4AddonPreferences(AddonPreferences):
         self.layout.prop(self, 'collision_regex', expand=True)
         self.layout.prop(self, 'export_collection_name', expand=True)
         self.layout.prop(self, 'perforce_enabled', expand=True)
+        self.layout.prop(self, 'export_on_save', expand=True)
+        self.layout.prop(self, 'unreal_content_path', expand=True)
+        self.layout.prop(self, 'verbose_logging', expand=True)
         
         box = self.layout.box()
         box.label(text="Collection Export:", icon="OUTLINER_OB_GROUP_INSTANCE")
@@ -193,6 +253,11 @@ class EZUE4AddonPreferences(AddonPreferences):
         box.prop(self, 'highpoly_regex', expand=True)
         box.prop(self, 'collection_export_name_template', expand=True)
 
+        box = self.layout.box()
+        box.label(text="Budgets:", icon="MEMORY")
+        box.prop(self, 'export_budgets', expand=True)
+        box.prop(self, 'over_budget_action', expand=True)
+
         box = self.layout.box()
         box.label(text="Armature Export:", icon="OUTLINER_OB_ARMATURE")
         box.prop(self, 'armature_export_name_template', expand=True)
@@ -2,12 +2,13 @@
 
 import bpy
 from os import listdir, path
-from bpy.types import Menu
+from bpy.types import Menu, Panel
 from bpy.utils import previews, register_class, unregister_class
 
 from .. import core
 from ..core import preferences
 from ..utils import objects, addon, perforce
+from ..utils.log import logger
 
 __icon_manager__ = None
 
@@ -26,7 +27,7 @@ class IconManager():
             if name_tokens[1] in self._supported_formats:
                 self.icons.load(name_tokens[0], filepath, 'IMAGE')
             else:
-                print(f"Error: Unsupported icon format '{name_tokens[1]}': {filepath}")
+                logger.error("Unsupported icon format '%s': %s", name_tokens[1], filepath)
 
     def unregister(self):
         """Remove the icon previews from Blender"""
@@ -39,7 +40,7 @@ def get_icon(name):
     try:
         return __icon_manager__.icons[name].icon_id
     except KeyError:
-        print(f"Error: Failed to find icon named '{name}'!")
+        logger.error("Failed to find icon named '%s'!", name)
         return None
 
 
@@ -203,9 +204,61 @@ class PieSave(Menu):
         else:
             row.label(text="No Export Collections", icon=CollectionExporter.custom_icon)
 
+class ExportStatsPanel(Panel):
+    """Geometry statistics of the planned exports (checked against the budgets)"""
+    bl_idname = "VIEW3D_PT_EZUE4_export_stats"
+    bl_label = "Export Stats"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'EZUE4'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        # counts are cached per mesh data-block (draw is called on every redraw)
+        from ..utils import stats
+        try:
+            budgets = stats.parse_budgets(preferences.export_budgets())
+        except ValueError:
+            self.layout.label(text="Invalid budgets in preferences!", icon="ERROR")
+            budgets = []
+
+        export_collections = core.find_exportable_collections()
+        export_armatures = core.find_exportable_armatures()
+        if not export_collections and not export_armatures:
+            self.layout.label(text="Nothing to export")
+            return
+
+        column = self.layout.column(align=True)
+        self.draw_header_row(column)
+        for collection in export_collections:
+            self.draw_stats_row(column, collection.name, stats.get_collection_stats(collection), budgets, "OUTLINER_OB_GROUP_INSTANCE")
+        for armature in export_armatures:
+            self.draw_stats_row(column, armature.name, stats.get_armature_stats(armature), budgets, "OUTLINER_OB_ARMATURE")
+
+    def draw_header_row(self, layout):
+        row = layout.split(factor=0.4, align=True)
+        row.label(text="Asset")
+        for text in ("Verts", "Tris", "Mats", "UVs"):
+            row.label(text=text)
+
+    def draw_stats_row(self, layout, name, asset_stats, budgets, icon):
+        from ..utils import stats
+        name = name.removeprefix(preferences.export_prefix())
+        violations = stats.get_budget_violations(asset_stats, stats.find_budget(name, budgets))
+        row = layout.split(factor=0.4, align=True)
+        row.alert = bool(violations)
+        row.label(text=name, icon="ERROR" if violations else icon)
+        for value in (asset_stats.vertices, asset_stats.triangles, asset_stats.material_slots, asset_stats.uv_channels):
+            row.label(text=f"{value:,}")
+        for violation in violations:
+            row = layout.row()
+            row.alert = True
+            row.label(text=violation)
+
 __classes__ = (
     EZUE4Menu,
     PieSave,
+    ExportStatsPanel,
 )
 
 def register():
@@ -1,13 +1,22 @@
 import bpy
 import os
 import fnmatch
-from bpy.props import BoolProperty
-from ..core import find_exportable_armatures, unselect_unwanted_objects_for_export, preferences
-from ..utils import collections, modifiers, objects, armatures, export, addon, modes
+from functools import partial
+from bpy.props import BoolProperty, FloatProperty
+from ..core import find_exportable_armatures, get_plan_settings, unselect_unwanted_objects_for_export, preferences
+from ..utils import collections, modifiers, objects, armatures, export, addon, modes, dirty, manifest, log, planner, modal_export
+from ..utils.log import logger
+from ..utils.memory import MemoryReport
+from ..utils.export_scene import TemporaryExportScene
+from ..utils.modal_export import ModalExportDriver
 
 ACTIONS_SUFFIX = "_Animations"
+# default of the fbx exporter
+UNREDUCED_SIMPLIFY_FACTOR = 1.0
+# every frame is keyed, the keys are reduced afterwards
+NO_SIMPLIFY_FACTOR = 0.0
 
-class AnimationExporter(bpy.types.Operator):
+class AnimationExporter(ModalExportDriver, bpy.types.Operator):
     """Export armatures"""
 
     bl_label = "Animation Export"
@@ -16,14 +25,23 @@ class AnimationExporter(bpy.types.Operator):
     custom_icon = 'OUTLINER_OB_ARMATURE'
 
     display_exportable: BoolProperty(name="Export Output", description="Should display the output result", default=False)
+    display_log: BoolProperty(name="Last Run Log", description="Show the log of the last export", default=False)
 
     should_export_mesh: BoolProperty(name="Mesh", default=True)
     should_export_actions: BoolProperty(name="Actions", default=True)
+    reduce_keyframes: BoolProperty(name="Reduce Keyframes", description="Drop baked keys that are reproduced within a tolerance per channel, constant channels keep a single key", default=False)
+    location_tolerance: FloatProperty(name="Location", description="Maximum error of reduced location curves (in exported units)", default=0.01, min=0.0, precision=4)
+    rotation_tolerance: FloatProperty(name="Rotation", description="Maximum error of reduced rotation curves (in degrees)", default=0.05, min=0.0, precision=4)
+    scale_tolerance: FloatProperty(name="Scale", description="Maximum error of reduced scale curves", default=0.001, min=0.0, precision=4)
+    run_preflight: BoolProperty(name="Preflight Check", description="Validate armatures before anything is written", default=True)
+
+    only_dirty: BoolProperty(name="Only Modified", description="Only export armatures modified since their last export", default=False, options={'HIDDEN', 'SKIP_SAVE'})
+    use_modal: BoolProperty(name="Modal", description="Export one action per timer tick (cancel with Esc)", default=True, options={'HIDDEN', 'SKIP_SAVE'})
 
     def execute(self, context):
         """Export armature and its actions"""
 
-        exportable_armatures = find_exportable_armatures()
+        exportable_armatures = self.find_filtered_exportable_armatures()
 
         # change to object mode
         modes.switch_to_object()
@@ -33,18 +51,84 @@ class AnimationExporter(bpy.types.Operator):
             self.report({'WARNING'}, "No exportable armatures found!")
             return {'FINISHED'}
 
-        try:
+        from ..utils import validation, stats # imports numpy, only needed when exporting
+        # meshes over budget are left out (also without preflight), their actions are still exported
+        self.refused_meshes = set()
+        if self.should_export_mesh:
+            issues, self.refused_meshes = validation.validate_budgets(
+                (armature.name, armature.name.removeprefix(preferences.export_prefix()), partial(stats.get_armature_stats, armature))
+                for armature in exportable_armatures)
+            if not validation.report_issues(self, issues, title="Budgets"):
+                return {'CANCELLED'}
+
+        if self.run_preflight:
+            issues = []
             for armature in exportable_armatures:
-                self.export_armature(armature)
-        except Exception as ex: 
-            self.report({'WARNING'}, "Export Failed! See console for more information")
-            print(f"Error: Failed to export, reason: {ex}")        
-
-        self.report({'INFO'}, f"Export Completed")
-        print("==========================")
-        print("Export complete")
-        print("==========================")
-        return {'FINISHED'}
+                issues += validation.validate_armature(armature, with_actions=self.should_export_actions)
+            if not validation.report_issues(self, issues):
+                return {'CANCELLED'}
+
+        # one action per timer tick (Esc cancels)
+        return self.run_export(context)
+
+    def begin_export(self, context):
+        """Sets up the export scene, returns one step per armature preparation, action and mesh"""
+        exportable_armatures = self.find_filtered_exportable_armatures()
+        self.exported_armatures = exportable_armatures
+        # children are resolved in the current scene (before switching)
+        export_objects = [(armature, objects.get_children_of(armature)) for armature in exportable_armatures]
+
+        self.manifest = manifest.ExportManifest()
+        # registered first to run last, after the armatures are restored
+        self.add_export_callback(self.mark_exported_armatures)
+        self.enter_export_context(MemoryReport("Animation export"))
+        # frame range and selection changes only affect the throwaway scene
+        self.export_scene = self.enter_export_context(TemporaryExportScene())
+        for armature, children in export_objects:
+            self.export_scene.link_object(armature)
+            for child in children:
+                self.export_scene.link_object(child)
+
+        steps = []
+        for armature in exportable_armatures:
+            steps.append((armature.name, partial(self.run_in_export_scene, self.prepare_armature, armature)))
+            if self.should_export_actions:
+                for action in armatures.get_actions_cached(armature):
+                    steps.append((f"{armature.name}: {action.name}", partial(self.run_in_export_scene, self.export_action, armature, action)))
+            if self.should_export_mesh and armature.name not in getattr(self, 'refused_meshes', ()):
+                steps.append((f"{armature.name}: Mesh", partial(self.run_in_export_scene, self.export_mesh, armature)))
+        return steps
+
+    def end_export(self, context, cancelled):
+        """Writes the manifest"""
+        self.export_cancelled = cancelled
+        if not cancelled and getattr(self, 'manifest', None):
+            self.manifest.write()
+
+    def mark_exported_armatures(self):
+        """Remembers the exported armatures as not modified (their state is recorded, so it has to be restored already)"""
+        if getattr(self, 'export_cancelled', True):
+            return
+        refused_meshes = getattr(self, 'refused_meshes', ())
+        for armature in getattr(self, 'exported_armatures', ()):
+            # stays modified until its mesh is within budget and exported
+            if armature.name not in refused_meshes:
+                dirty.mark_exported(dirty.ARMATURE, armature.name)
+
+    def find_filtered_exportable_armatures(self):
+        """Applies user filter to exportable armatures"""
+        exportable_armatures = find_exportable_armatures()
+        if self.only_dirty:
+            return [a for a in exportable_armatures if dirty.is_dirty(dirty.ARMATURE, a.name)]
+        return exportable_armatures
+
+    def run_in_export_scene(self, method, armature, *args):
+        """Runs an export step with the export scene as current scene"""
+        values = {'armature': armature.name}
+        if args:
+            values['action'] = args[0].name
+        with self.export_scene.activated(), log.context(**values):
+            method(armature, *args)
 
     def invoke(self, context, event):
         if preferences.show_export_dialog():
@@ -60,45 +144,52 @@ class AnimationExporter(bpy.types.Operator):
         row.prop(self, "should_export_mesh", text="Mesh", toggle=True)
         row.prop(self, "should_export_actions", text="Actions", toggle=True)
 
-        for armature in export_armatures:
-            root_bone_count = 0
-            for bone in armature.data.bones:
-                if not bone.parent:
-                    root_bone_count = root_bone_count + 1 
-            if root_bone_count > 1:
-                self.layout.row().label(text=f"'{armature.name}' has more than one root bone!", icon="ERROR")
-
         if self.should_export_actions:
-            for armature in export_armatures:
-                if not armatures.get_actions(armature):
-                    self.layout.row().label(text=f"'{armature.name}' has no actions", icon="ERROR")
+            self.layout.row().prop(self, "reduce_keyframes")
+            if self.reduce_keyframes:
+                row = self.layout.row(align=True)
+                row.prop(self, "location_tolerance")
+                row.prop(self, "rotation_tolerance")
+                row.prop(self, "scale_tolerance")
+
+        # cached per armature and action data-blocks (draw is called on every redraw)
+        from ..utils import validation
+        for armature in export_armatures:
+            for issue in validation.validate_armature(armature, with_actions=self.should_export_actions):
+                self.layout.row().label(text=issue.message, icon="ERROR")
         
         if not self.should_export_actions and not self.should_export_mesh:
             self.layout.row().label(text=f"Nothing to Export! (select 'Mesh' or 'Actions')", icon="ERROR")
 
+        box = self.layout.box()
+        box.prop(self, "display_log", icon="TRIA_DOWN" if self.display_log else "TRIA_RIGHT")
+        if self.display_log:
+            log.draw_lines(box)
+
         box2 = self.layout.box()
         box2.prop(self, "display_exportable", icon="TRIA_DOWN" if self.display_exportable else "TRIA_RIGHT", text="Output")
 
         if self.display_exportable:
             for armature in export_armatures:
                 inner_box = self.layout.box()
+                export_name = self.get_export_name_of_armature(armature)
                 
                 if self.should_export_mesh:
                     col = inner_box.column()
                     row = col.split(factor=0.05, align=True)
                     row.label(text="")
                     r = row.row(align=True)
-                    r.label(text=self.get_export_name_of_armature(armature), icon="MESH_DATA")
+                    r.label(text=export_name, icon="MESH_DATA")
 
                 if self.should_export_actions:
-                    actions = armatures.get_actions(armature)
+                    actions = armatures.get_actions_cached(armature)
                     if actions:
                         for action in actions:
                             col = inner_box.column()
                             row = col.split(factor=0.05, align=True)
                             row.label(text="")
                             r = row.row(align=True)
-                            r.label(text=self.get_export_name_of_armature(armature)+"_"+action.name, icon="ACTION")
+                            r.label(text=export_name+"_"+action.name, icon="ACTION")
                     else:
                         col = inner_box.column()
                         row = col.split(factor=0.05, align=True)
@@ -109,7 +200,7 @@ class AnimationExporter(bpy.types.Operator):
                     
     def select_armature_with_mesh(self, armature):
         """Selects only all child objects that must be exported with parent object"""
-        bpy.ops.object.select_all(action='DESELECT')
+        objects.deselect()
         for child in objects.get_children_of(armature):
             if child.name in bpy.context.view_layer.objects:
                 # With skeletal mesh the socket must be not exported,
@@ -121,36 +212,33 @@ class AnimationExporter(bpy.types.Operator):
  
     def get_export_name_of_armature(self, armature):
         """Generates the output name for an armature"""
-        name = preferences.armature_export_name_template()
-        armature_name = armature.name.removeprefix(preferences.export_prefix())
-        name = name.replace("$(armature)", armature_name)
-        name = name.replace("$(file)", addon.get_project_name())
-        return name
-
-    def batch_export_actions(self, armature):
-        """Export all actions as seperate fbx file"""
-        armatures.create_animation_data(armature)
-        actions = armatures.get_actions(armature)
-        for action in actions:
-            # set the scenes frame start/end from the actions frame range...
-            bpy.context.scene.frame_start, bpy.context.scene.frame_end = int(round(action.frame_range[0], 0)), int(round(action.frame_range[1], 0))
-            
-            armatures.clear_pose_transform(armature)
-            # setting the action to be the active one...
-            armature.animation_data.action = action
-
-            objects.deselect()
-            self.select_armature_with_mesh(armature)
-
-            armature.data.pose_position = 'POSE'            
-            self.export_action_as_fbx(self.get_export_name_of_armature(armature) + "_" + action.name)
+        return planner.get_armature_export_name(armature.name, get_plan_settings())
+
+    def export_action(self, armature, action):
+        """Export an action as seperate fbx file"""
+        # set the scenes frame start/end from the actions frame range...
+        bpy.context.scene.frame_start, bpy.context.scene.frame_end = int(round(action.frame_range[0], 0)), int(round(action.frame_range[1], 0))
+        
+        armatures.clear_pose_transform(armature)
+        # setting the action to be the active one...
+        armature.animation_data.action = action
+
+        objects.deselect()
+        self.select_armature_with_mesh(armature)
+
+        armature.data.pose_position = 'POSE'            
+        export_name = self.get_export_name_of_armature(armature)
+        export_path = self.export_action_as_fbx(export_name + "_" + action.name)
+        # unreal names the skeleton of an imported skeletal mesh <mesh>_Skeleton
+        self.manifest.add(export_path, manifest.ANIMATION, skeleton=export_name + "_Skeleton")
     
     def export_mesh(self, armature):
         """Export the armature and mesh"""
         objects.deselect()
         self.select_armature_with_mesh(armature)
 
-        self.export_mesh_as_fbx(self.get_export_name_of_armature(armature))
+        export_path = self.export_mesh_as_fbx(self.get_export_name_of_armature(armature))
+        self.manifest.add(export_path, manifest.SKELETAL_MESH)
         objects.deselect()
 
     def export_mesh_as_fbx(self, name):
@@ -170,10 +258,28 @@ class AnimationExporter(bpy.types.Operator):
             bake_anim=False,
             mesh_smooth_type="EDGE",
             use_selection=True)
+        return export_path
 
     def export_action_as_fbx(self, name):
         """Export fbx"""        
         export_path = os.path.join( preferences.source_path() , name + ".fbx")
+        if not self.reduce_keyframes:
+            self.bake_action_to_fbx(export_path, simplify_factor=UNREDUCED_SIMPLIFY_FACTOR, force_startend_keying=True)
+            return export_path
+
+        # baked once with a key per frame, the curves of the written file are reduced
+        from ..utils import keyframes # imports numpy, only needed when reducing
+        self.bake_action_to_fbx(export_path, simplify_factor=NO_SIMPLIFY_FACTOR, force_startend_keying=True)
+        keys_before, keys_after = keyframes.reduce_fbx_keys(export_path, {
+            keyframes.TRANSLATION: self.location_tolerance,
+            keyframes.ROTATION: self.rotation_tolerance,
+            keyframes.SCALE: self.scale_tolerance,
+        })
+        logger.info("Action '%s': %d -> %d keys (%.0f%% removed)", name, keys_before, keys_after, 100.0 * (keys_before - keys_after) / max(1, keys_before))
+        return export_path
+
+    def bake_action_to_fbx(self, export_path, simplify_factor, force_startend_keying):
+        """Bakes the active action of the selected armature to a fbx"""
         bpy.ops.export_scene.fbx(
             filepath=bpy.path.abspath(export_path),
             object_types={'ARMATURE', 'EMPTY'},
@@ -189,26 +295,22 @@ class AnimationExporter(bpy.types.Operator):
             bake_anim_use_all_bones=True,
             bake_anim_use_nla_strips=False,
             bake_anim_use_all_actions=False,
-            bake_anim_force_startend_keying=True,
+            bake_anim_simplify_factor=simplify_factor,
+            bake_anim_force_startend_keying=force_startend_keying,
             mesh_smooth_type="EDGE",
             use_mesh_edges=False,
             batch_mode='OFF',
             use_selection=True)
 
-    def export_armature(self, armature):
-        self.report({'INFO'}, f"Exporting collection '{armature.name}'")
-        print("==========================")
-        print("Exporting Armature: "+armature.name)
-        print("==========================")
+    def prepare_armature(self, armature):
+        """Scales the armature for export (restored when the export ended)"""
+        self.report({'INFO'}, f"Exporting armature '{armature.name}'")
+        logger.info("Exporting armature '%s'", armature.name)
         
+        # restores scale, action and pose exactly (instead of scaling back)
+        self.enter_export_context(armatures.ArmatureStateContext(armature))
         self.scale_armature_for_export(armature)
-        
-        if self.should_export_actions:
-            self.batch_export_actions(armature)
-        if self.should_export_mesh:
-            self.export_mesh(armature)
-
-        self.revert_scale_armature_for_export(armature)
+        armatures.create_animation_data(armature)
     
     def scale_armature_for_export(self, armature):
         """Apply armature scale for ue4 export"""
@@ -218,18 +320,10 @@ class AnimationExporter(bpy.types.Operator):
         objects.unit_scale_selected(export_scale_factor)
         objects.deselect()
 
-    def revert_scale_armature_for_export(self, armature):
-        """Revert armature scale after ue4 export"""
-        objects.deselect()
-        export_scale_factor = export.units_blender_to_fbx_factor()
-        objects.set_active(armature)
-        objects.unit_scale_selected(1.0/export_scale_factor)
-        objects.deselect()
-
     @classmethod
     def poll(cls, context):
         """Only allows this operator to execute if there is a valid selection."""
-        return find_exportable_armatures() and bpy.data.is_saved
+        return find_exportable_armatures() and bpy.data.is_saved and not modal_export.is_export_running()
 
 
 def menu_draw(self, context):
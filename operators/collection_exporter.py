@@ -2,14 +2,20 @@
 
 import bpy
 import os
-import re
-from bpy.props import BoolProperty, EnumProperty
-from ..core import find_exportable_collections, unselect_unwanted_objects_for_export, preferences
-from ..utils import collections, modifiers, objects, export, addon, modes
-
-BUNDLE_SUFFIX = '_bundle'
-
-class CollectionExporter(bpy.types.Operator):
+from functools import partial
+from mathutils import Matrix
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, IntProperty, StringProperty
+from ..core import find_exportable_collections, get_plan_settings, unselect_unwanted_objects_for_export, preferences
+from ..utils import collections, modifiers, objects, export, addon, modes, dirty, manifest, log, planner, modal_export
+from ..utils.log import logger
+from ..utils.datablocks import DataBlockTracker
+from ..utils.export_scene import TemporaryExportScene
+from ..utils.modal_export import ModalExportDriver
+from ..utils.memory import MemoryReport
+
+INSTANCES_SUFFIX = '_instances'
+
+class CollectionExporter(ModalExportDriver, bpy.types.Operator):
     """ Export collections """
 
     bl_idname = "screen.ezue4_export"
@@ -20,16 +26,51 @@ class CollectionExporter(bpy.types.Operator):
     fix_scale_on_export: BoolProperty(name="Fix Scale", description="Scale x100 to fix unreal scaling issues", default=True)
     auto_uv_unwrap_export: BoolProperty(name="Force AutoUV Unwrap", description="Force Automated unwrapping after merging objects for all collections", default=False)
     clean_up_export: BoolProperty(name="Clean-Up Export", description="Clean-Up will delete the meshes generated for export", default=True)
+    consolidate_materials: BoolProperty(name="Merge Material Slots", description="Merge duplicate material slots of the joined mesh (fewer sections in unreal)", default=True)
+    weld_seams: BoolProperty(name="Weld Seams", description="Merge coincident vertices at the seams of the joined objects", default=False)
+    weld_distance: FloatProperty(name="Weld Distance", description="Vertices closer than this are merged", default=0.0001, min=0.0, precision=5, subtype='DISTANCE')
+    instance_shared_meshes: BoolProperty(name="Instance Shared Meshes", description="Export linked duplicates once and write their placements to a json sidecar (instead of joining every copy)", default=False)
+    generate_lods: BoolProperty(name="Generate LODs", description="Export decimated LODs of the joined mesh as LOD group in the same fbx", default=False)
+    lod_levels: StringProperty(name="LOD Levels", description="Comma separated LOD1..N, values up to 1 are decimate ratios, larger values are triangle budgets", default="0.5, 0.25, 0.125")
+    lightmap_uvs: BoolProperty(name="Lightmap UVs", description="Add a packed lightmap uv channel to the joined mesh (cached while the geometry is unchanged), unreal does not generate them on import", default=False)
+    lightmap_margin: FloatProperty(name="Margin", description="Margin between the lightmap islands", default=0.1, min=0.001, max=1.0)
+    export_textures: BoolProperty(name="Export Textures", description="Write the images used by the materials as png to the 'Textures' folder (unchanged images are skipped)", default=False)
+    texture_max_size: EnumProperty(name="Max Size", description="Downscale larger textures", items=(
+        ('0', "Original", "Keep the size"),
+        ('4096', "4096", ""),
+        ('2048', "2048", ""),
+        ('1024', "1024", ""),
+        ('512', "512", ""),
+    ), default='0')
+    chunk_mode: EnumProperty(name="Split Into Cells", description="Export one fbx per grid cell (only changed cells are written again)", items=(
+        ('NONE', "Off", "Join the collection into one mesh"),
+        ('OBJECT', "By Object", "Objects go to the cell of their center"),
+        ('FACE', "By Face", "Faces go to the cell of their center (splits objects)"),
+    ), default='NONE')
+    chunk_size: FloatProperty(name="Cell Size", description="Size of the grid cells", default=50.0, min=0.01, subtype='DISTANCE')
     child_bundle_export: BoolProperty(name="Bundle Children", description="Merges child collections seperate and exports them as one fbx (not joined together)", default=True)
+    native_fbx_export: BoolProperty(name="Native FBX Writer", description="Write static meshes with the streaming fbx writer (falls back to the stock exporter if not supported)", default=False)
+    validate_native_fbx: BoolProperty(name="Validate Native FBX", description="Compare the native fbx with a stock export by re-importing both (slow)", default=False)
 
     should_export_other: BoolProperty(name="Other", default=True)
     should_export_lp: BoolProperty(name="LP", default=True)
     should_export_hp: BoolProperty(name="HP", default=True)
     should_export_ucx: BoolProperty(name="UCX", default=True)
+    generate_collision: EnumProperty(name="Generate UCX", description="Collision for collections without UCX collection", items=(
+        ('NONE', "None", "Unreal falls back to per poly collision"),
+        ('HULL', "Convex Hull", "One convex hull of the joined mesh"),
+        ('DECOMPOSE', "Convex Decomposition", "Approximate convex decomposition into multiple hulls"),
+    ), default='NONE')
+    max_hulls: IntProperty(name="Max Hulls", description="Maximum number of hulls of the convex decomposition", default=8, min=1, max=64)
 
     should_export_disabled: BoolProperty(name="Export Excluded Collections", default=False)
+    run_preflight: BoolProperty(name="Preflight Check", description="Validate uvs, faces and collision before anything is joined or written", default=True)
 
     display_exportable: BoolProperty(name="Export Output", description="Should display the output result", default=False)
+    display_log: BoolProperty(name="Last Run Log", description="Show the log of the last export", default=False)
+
+    only_dirty: BoolProperty(name="Only Modified", description="Only export collections modified since their last export", default=False, options={'HIDDEN', 'SKIP_SAVE'})
+    use_modal: BoolProperty(name="Modal", description="Export one collection per timer tick (cancel with Esc)", default=True, options={'HIDDEN', 'SKIP_SAVE'})
 
     def execute(self, context):
         """Exports the Export Collections"""        
@@ -38,38 +79,89 @@ class CollectionExporter(bpy.types.Operator):
         modes.switch_to_object()
         modes.exit_local_view()
 
-        collections_to_export = self.find_filtered_exportable_collections()
-        if not collections_to_export:
+        plans = self.plan_export()
+        if not plans:
             self.report({'WARNING'}, "No matching collections to export!")
             return {'FINISHED'}
 
-        try:
-            self.export_collections(collections_to_export)
-        except Exception as ex: 
-            self.report({'WARNING'}, "Export Failed! See console for more information")
-            print(f"Error: Failed to export, reason: {ex}")
-            import traceback
-            traceback.print_exc()
-
-        return {'FINISHED'}
+        # over budget collections are left out (also without preflight)
+        refused_collections = self.check_budgets(plans)
+        if refused_collections is None:
+            return {'CANCELLED'}
+        plans = [plan for plan in plans if plan.name not in refused_collections]
+        if not plans:
+            self.report({'WARNING'}, "All collections are over budget!")
+            return {'FINISHED'}
 
-    def find_filtered_exportable_collections(self):
-        """ Applies user filter to exportable collections """
+        if self.run_preflight and not self.preflight(plans):
+            return {'CANCELLED'}
+
+        if self.generate_lods:
+            from ..utils import lods
+            try:
+                lods.parse_lod_levels(self.lod_levels)
+            except ValueError as ex:
+                self.report({'ERROR'}, f"Invalid LOD levels: {ex}")
+                return {'CANCELLED'}
+
+        # one collection per timer tick (Esc cancels)
+        self.plans = plans
+        return self.run_export(context)
+
+    def check_budgets(self, plans):
+        """Validates the planned collections against their budgets, returns the names of the refused ones (None on errors)"""
+        from ..utils import validation, stats # imports numpy, only needed when exporting
+        export_prefix = preferences.export_prefix()
+        issues, refused = validation.validate_budgets(
+            (plan.name, plan.name.removeprefix(export_prefix), partial(stats.get_collection_stats, bpy.data.collections[plan.name]))
+            for plan in plans)
+        if not validation.report_issues(self, issues, title="Budgets"):
+            return None
+        return refused
+
+    def preflight(self, plans):
+        """Validates all planned collections (and their ucx) before exporting, returns False on errors"""
+        from ..utils import validation # imports numpy, only needed when exporting
+        issues = []
+        for plan in plans:
+            issues += validation.validate_collection(bpy.data.collections[plan.name], self.get_ucx_collection(plan), plan.auto_uv)
+            for child_name, _ in plan.bundle_children:
+                issues += validation.validate_collection(bpy.data.collections[child_name], auto_uv=plan.auto_uv)
+        return validation.report_issues(self, issues)
+
+    def plan_export(self):
+        """ Plans the export of the filtered collections (export names, ucx, auto uv and bundles) """
         exportable_collections = find_exportable_collections()
-        filtered_exportable_collections = []
+        layer_collections = collections.get_layer_collections_by_name()
+        collection_infos = []
         for collection in exportable_collections:
-            if collections.find_layer_collection_with_name(collection.name).exclude and not self.should_export_disabled:
-                continue # ignore excluded collection if desired
-            if self.is_collection_hp(collection):
-                if self.should_export_hp:
-                    filtered_exportable_collections.append(collection)
-            elif self.is_collection_lp(collection):
-                if self.should_export_lp:
-                    filtered_exportable_collections.append(collection)
-            elif self.should_export_other:
-                filtered_exportable_collections.append(collection)
-        return filtered_exportable_collections
-        
+            layer_collection = layer_collections.get(collection.name)
+            collection_infos.append(planner.CollectionInfo(
+                collection.name,
+                children=tuple(child.name for child in collection.children),
+                excluded=bool(layer_collection and layer_collection.exclude),
+                # compares the exported state if modified, only needed when filtering
+                dirty=dirty.is_dirty(dirty.COLLECTION, collection.name) if self.only_dirty else True,
+            ))
+        # settings are read once per plan (draw is called on every redraw)
+        return planner.plan_collections(collection_infos, set(bpy.data.collections.keys()), self.get_plan_settings())
+
+    def get_ucx_collection(self, plan):
+        """ UCX collection of a planned collection (None if there is none or ucx is not exported) """
+        return bpy.data.collections.get(plan.ucx_name) if plan.ucx_name else None
+
+    def get_plan_settings(self):
+        """ Planner settings of the preferences and the operator options """
+        return get_plan_settings(
+            export_lp=self.should_export_lp,
+            export_hp=self.should_export_hp,
+            export_other=self.should_export_other,
+            export_excluded=self.should_export_disabled,
+            export_ucx=self.should_export_ucx,
+            only_dirty=self.only_dirty,
+            bundle_children=self.child_bundle_export,
+            force_auto_uv=self.auto_uv_unwrap_export,
+        )
 
     def invoke(self, context, event):
         if preferences.show_export_dialog:
@@ -97,95 +189,179 @@ class CollectionExporter(bpy.types.Operator):
         row.prop(self, "should_export_lp", text="LP", toggle=True)
         row.prop(self, "should_export_hp", text="HP", toggle=True)
         row.prop(self, "should_export_ucx", text="UCX", toggle=True, icon="MESH_CUBE")
+        if self.should_export_ucx:
+            row = box.row(align=True)
+            row.prop(self, "generate_collision")
+            if self.generate_collision == 'DECOMPOSE':
+                row.prop(self, "max_hulls")
 
         row = box.row()
         row.prop(self, "fix_scale_on_export")
         row.prop(self, "auto_uv_unwrap_export")
         row = box.row()
         row.prop(self, "clean_up_export")
+        row.prop(self, "run_preflight")
+        row = box.row()
+        row.prop(self, "weld_seams")
+        if self.weld_seams:
+            row.prop(self, "weld_distance")
+        row = box.row()
+        row.prop(self, "consolidate_materials")
+        row = box.row()
+        row.prop(self, "generate_lods")
+        if self.generate_lods:
+            row.prop(self, "lod_levels", text="")
+        row = box.row()
+        row.prop(self, "instance_shared_meshes")
 
         if self.has_any_export_collection_children():
             row.prop(self, "child_bundle_export")
 
-        export_collections = self.find_filtered_exportable_collections()
+        row = box.row()
+        row.prop(self, "chunk_mode")
+        if self.chunk_mode != 'NONE':
+            row.prop(self, "chunk_size")
+        row = box.row()
+        row.prop(self, "lightmap_uvs")
+        if self.lightmap_uvs:
+            row.prop(self, "lightmap_margin")
+        row = box.row()
+        row.prop(self, "export_textures")
+        if self.export_textures:
+            row.prop(self, "texture_max_size", text="")
+
+        row = box.row()
+        row.prop(self, "native_fbx_export")
+        if self.native_fbx_export:
+            row.prop(self, "validate_native_fbx")
+
+        plans = self.plan_export()
 
         box2 = self.layout.box()
-        box2.prop(self, "display_exportable", icon="TRIA_DOWN" if self.display_exportable else "TRIA_RIGHT", text=f"Output ({len(export_collections)})")
+        box2.prop(self, "display_exportable", icon="TRIA_DOWN" if self.display_exportable else "TRIA_RIGHT", text=f"Output ({len(plans)})")
 
         if self.display_exportable:
-            for collection in export_collections:
+            for plan in plans:
                 row = box2.row()
                 row.alignment = 'LEFT'
                 row.label(icon="EXPORT")
-                if self.should_export_ucx and self.get_collections_ucx(collection):
+                if plan.ucx_name or (self.should_export_ucx and self.generate_collision != 'NONE'):
                     row.label(icon="MESH_CUBE")
-                if self.auto_uv_unwrap_export or self.is_collection_with_auto_uv_export(collection):
+                if plan.auto_uv:
                     row.label(icon="TEXTURE")
-                row.label(text=self.get_export_name_of_collection(collection))
-                if collection.children and self.child_bundle_export:
-                    box2.row().label(text=self.get_bundle_export_name_of_collection(collection), icon="EXPORT")       
+                row.label(text=plan.export_name)
+                if plan.bundle_name:
+                    box2.row().label(text=plan.bundle_name, icon="EXPORT")       
+
+        box3 = self.layout.box()
+        box3.prop(self, "display_log", icon="TRIA_DOWN" if self.display_log else "TRIA_RIGHT")
+        if self.display_log:
+            log.draw_lines(box3)
+
 
+    def create_ucx_export_objects(self, ucx_collection, exportName):
+        """ Creates copies of the ucx objects named to UCX standard (the source objects are not renamed or transformed) """
+        prefix = "UCX_" + exportName + "_"
+        ucx_objects = [obj for obj in ucx_collection.all_objects
+                       if obj.type == 'MESH' and not obj.name.startswith(preferences.export_exclude_object_prefix())]
 
-    def rename_ucx_collection_objects(self, collectionName, exportName):
-        """ Renames all objects of the collection to UCX standard """
-        # avoid name intersections
-        for obj in bpy.data.collections[collectionName].all_objects:
-            if obj.type == 'MESH':
-                obj.name = "UCX_rename"
+        # also objects already named to UCX standard are copied (the export applies scale and rotation),
+        # unreal only matches the prefix, so the copies can take the next free numbers
+        copies = []
         i = 0
-        for obj in bpy.data.collections[collectionName].all_objects:
-            if obj.type == 'MESH':
-                i += 1 
-                obj.name = "UCX_"+exportName+"_{:02d}".format(i)
+        for obj in ucx_objects:
+            # skip numbers that are taken (instead of renaming other objects)
+            name = None
+            while not name or name in bpy.data.objects:
+                i += 1
+                name = prefix + "{:02d}".format(i)
+            copy = obj.copy()
+            copy.data = obj.data.copy()
+            copy.name = name
+            copy.parent = None
+            copy.matrix_world = obj.matrix_world
+            copies.append(copy)
+        collections.link_objects_to_collection_with_name(copies, preferences.export_collection_name())
+        return copies
+
+    def create_generated_ucx_objects(self, mesh, exportName):
+        """ Creates convex hull objects of the joined mesh named to UCX standard (hulls are cached while the mesh is unchanged) """
+        from ..utils import collision
+        hull_meshes = collision.get_hull_meshes(mesh, self.generate_collision, self.max_hulls, exportName)
+        ucx_objects = []
+        for i, hull_mesh in enumerate(hull_meshes, 1):
+            obj = bpy.data.objects.new("UCX_" + exportName + "_{:02d}".format(i), hull_mesh.copy())
+            obj.matrix_world = mesh.matrix_world.copy()
+            ucx_objects.append(obj)
+        collections.link_objects_to_collection_with_name(ucx_objects, preferences.export_collection_name())
+        logger.info("Generated %d UCX hulls for '%s'", len(ucx_objects), exportName)
+        return ucx_objects
 
     def selection_non_child_as_active(self):
         """ Set first that has no parent as active """
         # (bug with decals) 
-        for obj in bpy.context.selected_objects:
-            print("checking: "+obj.name)
+        for obj in objects.get_selected():
+            logger.debug("checking: %s", obj.name)
             if not obj.parent:
-                print("set active Element: "+obj.name)
+                logger.debug("set active Element: %s", obj.name)
                 bpy.context.view_layer.objects.active = obj
                 if not obj.children:
-                    print("also no children: "+obj.name)
+                    logger.debug("also no children: %s", obj.name)
                     break
 
-    def join_collection(self, collection, joinedMeshName):
+    def join_collection(self, collection, joinedMeshName, exclude=()):
         if not collection:
             return
-        print("Joining Collection: " + collection.name)
+        logger.debug("Joining Collection: %s", collection.name)
         # makes shure the collection is included (else we cant select objects of this collection)
         was_excluded = collections.find_layer_collection_with_name(collection.name).exclude
         collections.find_layer_collection_with_name(collection.name).exclude = False
 
         collections.select_objects_of_collection_with_name(collection.name)
+        for obj in exclude:
+            objects.remove_from_selection(obj)
+        if objects.get_selected():
+            self.join_selected(joinedMeshName)
+        collections.find_layer_collection_with_name(collection.name).exclude = was_excluded
 
+    def select_collection_objects(self, collection, exclude=()):
+        """ Selects the objects of an included collection that get joined, returns them """
+        collections.select_objects_of_collection_with_name(collection.name)
+        for obj in exclude:
+            objects.remove_from_selection(obj)
+        objects.unselect_none_solid()
+        unselect_unwanted_objects_for_export()
+        return objects.get_selected()
+
+    def join_selected(self, joinedMeshName):
+        """ Joins the selected objects and moves the result to the export collection """
         # join objects of collection into one object
         joined_object = objects.smart_join_selected(joinedMeshName)
+
+        # one slot per source object would become one section (draw call) each in unreal
+        if self.consolidate_materials:
+            self.consolidate_material_slots(joined_object)
+
+        # duplicate vertices at the seams of kit pieces
+        if self.weld_seams:
+            self.weld_joined_object(joined_object)
         
         # move to export collection
         collections.move_to_collection_with_name(joined_object, preferences.export_collection_name())
-        collections.find_layer_collection_with_name(collection.name).exclude = was_excluded
+        return joined_object
 
-    def is_collection_with_auto_uv_export(self, collection):
-        """Should collection use auto uv when exporting"""
-        if collection:
-            return collection.name.startswith(preferences.export_prefix() + preferences.autouv_prefix())
-        return False
+    def consolidate_material_slots(self, joined_object):
+        """Merges duplicate material slots of a joined mesh"""
+        from ..utils import materials
+        sections_before, sections_after = materials.consolidate_material_slots(joined_object)
+        logger.info("Material sections of '%s': %d -> %d", joined_object.name, sections_before, sections_after)
+
+    def weld_joined_object(self, joined_object):
+        """Merges coincident vertices of a joined mesh"""
+        from ..utils import weld
+        removed = weld.weld_mesh(joined_object.data, self.weld_distance)
+        logger.info("Welded '%s': %d vertices removed", joined_object.name, removed)
 
-    def get_export_name_of_collection(self, collection):
-        """Gets the export name of an collection"""
-        name = preferences.collection_export_name_template()
-        collection_name = collection.name.removeprefix(preferences.export_prefix())
-        collection_name = collection_name.removeprefix(preferences.autouv_prefix())
-        name = name.replace("$(collection)", collection_name)
-        name = name.replace("$(file)", addon.get_project_name())
-        return name
-
-    def get_bundle_export_name_of_collection(self, collection):
-        """Gets the bundle export name of an collection"""
-        return self.get_export_name_of_collection(collection) + BUNDLE_SUFFIX
-   
     def set_up_export_collection_with_name(self, collectionName):
         """ Creates the export collection or deletes all objects inside if it alredy exists """
         # create Export Collection if not exist
@@ -194,137 +370,297 @@ class CollectionExporter(bpy.types.Operator):
         # make shure the collection is included
         collections.find_layer_collection_with_name(collectionName).exclude = False
 
-        bpy.ops.object.select_all(action='DESELECT')
-
-        #select all objects in Export and delete them
-        collections.select_objects_of_collection_with_name(collectionName)
-        bpy.ops.object.delete()
+        # delete all objects in Export
+        collections.delete_objects_of_collection(bpy.data.collections[collectionName])
 
-    def export_collection_children_as_bundle(self, collection):
-        if not collection.children:
+    def export_collection_children_as_bundle(self, plan):
+        if not plan.bundle_children:
             return
         objects.deselect()
         # join individual collections
-        for childCollection in collection.children:
-            self.join_collection(childCollection, self.get_export_name_of_collection(childCollection))
+        for child_name, child_export_name in plan.bundle_children:
+            self.join_collection(bpy.data.collections[child_name], child_export_name)
 
         # auto uv
-        if self.auto_uv_unwrap_export or self.is_collection_with_auto_uv_export(collection):
-            for childCollection in collection.children:
+        if plan.auto_uv:
+            for _, child_export_name in plan.bundle_children:
                 objects.deselect()
-                objects.set_active_with_name(self.get_export_name_of_collection(childCollection))
+                objects.set_active_with_name(child_export_name)
                 objects.auto_uv_selected()
 
         # select joined
-        for childCollection in collection.children:
-            objects.set_active_with_name(self.get_export_name_of_collection(childCollection))
+        for _, child_export_name in plan.bundle_children:
+            objects.set_active_with_name(child_export_name)
 
         # move to export collection
-        for selected_object in bpy.context.selected_objects:
-            collections.move_to_collection_with_name(selected_object, preferences.export_collection_name())
+        collections.move_objects_to_collection_with_name(objects.get_selected(), preferences.export_collection_name())
         
-        if not bpy.context.selected_objects:
+        if not objects.get_selected():
             return
 
         #export as bundle
-        parentExportName = self.get_export_name_of_collection(collection) + BUNDLE_SUFFIX
+        parentExportName = plan.bundle_name
         export_path = os.path.join( preferences.source_path() , parentExportName + ".fbx")
-        export.selected_objects_as_fbx(fix_scale = self.fix_scale_on_export, export_path=export_path)
+        export.selected_objects_as_fbx(fix_scale = self.fix_scale_on_export, export_path=export_path, native=self.native_fbx_export, validate_native=self.validate_native_fbx)
+        self.manifest.add(export_path, manifest.STATIC_MESH)
         objects.deselect()
 
-    def export_collection(self, collection):
+    def export_collection(self, collection, plan):
         """ Export objects of a collection to a FBX """
         if not collection:
             return
 
         self.report({'INFO'}, f"Exporting collection '{collection.name}'")
-        print("==========================")
-        print("Exporting: "+collection.name)
-        print("==========================")
+        logger.info("Exporting collection")
+        # hide_viewport is not per scene, so it has to be restored
+        was_hidden = collection.hide_viewport
         collections.unhide_collection(collection)
-        exportName = self.get_export_name_of_collection(collection)
+        try:
+            self.export_unhidden_collection(collection, plan)
+        finally:
+            collection.hide_viewport = was_hidden
+
+    def export_unhidden_collection(self, collection, plan):
+        """ Export objects of a visible collection to a FBX """
+        exportName = plan.export_name
         
-        if self.child_bundle_export:
-            self.export_collection_children_as_bundle(collection)            
+        if plan.bundle_name:
+            self.export_collection_children_as_bundle(plan)
+
+        # linked duplicates are exported once instead of being joined
+        instanced_objects = []
+        if self.instance_shared_meshes:
+            instanced_objects = self.export_instanced_meshes(collection, exportName)
+
+        # one mesh per grid cell
+        if self.chunk_mode != 'NONE':
+            self.export_collection_chunks(collection, plan, exclude=instanced_objects)
+            return
 
         # join mesh to one
-        self.join_collection(collection, exportName)
+        self.join_collection(collection, exportName, exclude=instanced_objects)
 
-        # select joined mesh
         mesh = bpy.context.scene.objects.get(exportName)
+        if not mesh:
+            # everything was instanced
+            return
+        self.export_joined_mesh(mesh, exportName, plan.auto_uv, self.get_ucx_collection(plan))
+
+    def export_joined_mesh(self, mesh, exportName, auto_uv, ucx_collection=None):
+        """ Prepares a joined mesh (uvs, lods, collision) and exports it to a FBX """
+        # select joined mesh
+        objects.select_only([mesh])
         objects.set_active(mesh)
 
         # auto UV
-        if self.auto_uv_unwrap_export or self.is_collection_with_auto_uv_export(collection):
+        if auto_uv:
             objects.auto_uv_selected()
 
+        # second uv channel for static lighting (the lods are decimated with it)
+        lightmap_index = None
+        if self.lightmap_uvs:
+            lightmap_index = self.add_lightmap_uvs(mesh, exportName)
+
+        # decimated LOD1..N (mesh becomes LOD0 of the group)
+        lod_objects = []
+        if self.generate_lods:
+            lod_objects = self.create_lod_group(mesh, exportName)
+
         # prepare and select ucx (colliders)
-        has_ucx = False
-        was_ucx_excluded = False
-        if self.should_export_ucx:
-            ucx_collection = self.get_collections_ucx(collection)
-            if ucx_collection:                
-                has_ucx = True
-                # makes shure the collection is included (else we cant select objects of this collection)
-                was_ucx_excluded = collections.find_layer_collection_with_name(ucx_collection.name).exclude
-                collections.find_layer_collection_with_name(ucx_collection.name).exclude = False
-
-                self.rename_ucx_collection_objects(ucx_collection.name, exportName)
-                collections.select_objects_of_collection(ucx_collection)
-                unselect_unwanted_objects_for_export()
+        ucx_objects = []
+        if ucx_collection:
+            ucx_objects = self.create_ucx_export_objects(ucx_collection, exportName)
+        elif self.should_export_ucx and self.generate_collision != 'NONE':
+            ucx_objects = self.create_generated_ucx_objects(mesh, exportName)
         
-        # set joined mesh as active
+        # select joined mesh and ucx, set joined mesh as active
+        objects.deselect()
+        for obj in ucx_objects + lod_objects:
+            objects.add_to_selection(obj)
         objects.set_active(mesh)
 
         #export fbx
         export_path = os.path.join( preferences.source_path() , exportName + ".fbx")
-        export.selected_objects_as_fbx(fix_scale=self.fix_scale_on_export, export_path=export_path)
-
-        # reset ucx exclude state
-        if has_ucx:
-            collections.find_layer_collection_with_name(ucx_collection.name).exclude = was_ucx_excluded
-
-    def is_collection_lp(self, collection):
-        """ If a collection is marked as low poly """
-        return re.search(preferences.lowpoly_regex(), collection.name)
-
-    def is_collection_hp(self, collection):
-        """ If a collection is marked as high poly """
-        return re.search(preferences.highpoly_regex(), collection.name)
-
-    def get_ucx_collections(self):
-        """ Finds the ucx (ue collision collection) for an collection """
-        collections = []
-        for c in bpy.data.collections:
-            if c.name.startswith(preferences.collision_prefix()):
-                collections.append(c)
-        return collections
-
-    def get_collections_ucx(self, collection):
-        """ Finds the ucx (ue collision collection) for an collection """
-        clean_name = collection.name.removeprefix(preferences.export_prefix())
-        for c in self.get_ucx_collections():
-            if c.name.removeprefix(preferences.collision_prefix()) == clean_name:
-                return c
-        return None
-        
-    def export_collections(self, exportCollections):
-        """Exports all exportCollections to a fbx file"""
-        self.set_up_export_collection_with_name(preferences.export_collection_name())
-        for export in exportCollections:
-            self.export_collection(export)
-        if self.clean_up_export:
-            collections.delete_collection_with_name(preferences.export_collection_name())
-    
-        self.report({'INFO'}, f"Export Completed")
-        print("==========================")
-        print("Export complete")
-        print("==========================")
+        export.selected_objects_as_fbx(fix_scale=self.fix_scale_on_export, export_path=export_path, native=self.native_fbx_export, validate_native=self.validate_native_fbx)
+        # lod objects are the group, LOD0 and the generated lods
+        self.manifest.add(export_path, manifest.STATIC_MESH, has_ucx=bool(ucx_objects), lod_count=max(1, len(lod_objects) - 1), lightmap_index=lightmap_index)
+
+    def export_collection_chunks(self, collection, plan, exclude=()):
+        """ Exports one FBX per non-empty grid cell of a collection, cells whose content did not change are not joined or written again """
+        from ..utils import chunks
+        exportName = plan.export_name
+        if plan.ucx_name:
+            logger.warning("UCX collections are not split into cells, the cells of '%s' are exported without them", collection.name)
+
+        directory = str(preferences.source_path())
+        cache = chunks.ChunkCache(directory, exportName)
+        # everything that changes the written file besides the source objects
+        settings = (self.chunk_mode, self.chunk_size, self.consolidate_materials, self.weld_seams, self.weld_distance, plan.auto_uv,
+                    self.lightmap_uvs, self.lightmap_margin, self.generate_lods, self.lod_levels, self.should_export_ucx,
+                    self.generate_collision, self.max_hulls, self.fix_scale_on_export, self.native_fbx_export)
+
+        # makes shure the collection is included (else we cant select objects of this collection)
+        was_excluded = collections.find_layer_collection_with_name(collection.name).exclude
+        collections.find_layer_collection_with_name(collection.name).exclude = False
+        try:
+            source_objects = self.select_collection_objects(collection, exclude)
+            if self.chunk_mode == chunks.OBJECT:
+                cell_sources = chunks.group_objects_by_cell(source_objects, self.chunk_size)
+            else:
+                cell_sources = chunks.group_objects_by_face_cells(source_objects, self.chunk_size, bpy.context.evaluated_depsgraph_get())
+
+            # the source objects are hashed before anything is joined, unchanged cells are skipped entirely
+            changed_cells = {}
+            for cell, cell_objects in cell_sources.items():
+                file_name = chunks.get_chunk_name(exportName, cell) + ".fbx"
+                key = chunks.get_cell_key(cell_objects, settings)
+                if cache.is_unchanged(file_name, key):
+                    cache.record(file_name, key)
+                else:
+                    changed_cells[cell] = (file_name, key)
+
+            chunk_objects = {}
+            if changed_cells and self.chunk_mode == chunks.OBJECT:
+                for cell in changed_cells:
+                    objects.select_only(cell_sources[cell])
+                    chunk_objects[cell] = self.join_selected(chunks.get_chunk_name(exportName, cell))
+            elif changed_cells:
+                # faces of the objects of changed cells, split once (parts of unchanged cells are left out)
+                objects.select_only({obj for cell in changed_cells for obj in cell_sources[cell]})
+                mesh = self.join_selected(exportName)
+                parts = chunks.split_by_face_centroid(mesh, self.chunk_size) if mesh else {}
+                chunk_objects = {cell: part for cell, part in parts.items() if cell in changed_cells}
+        finally:
+            collections.find_layer_collection_with_name(collection.name).exclude = was_excluded
+
+        for cell, obj in sorted(chunk_objects.items()):
+            file_name, key = changed_cells[cell]
+            chunkName = chunks.get_chunk_name(exportName, cell)
+            obj.name = chunkName
+            self.export_joined_mesh(obj, chunkName, plan.auto_uv)
+            cache.record(file_name, key)
+
+        for file_name in cache.get_stale():
+            path = os.path.join(directory, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+                logger.info("Removed '%s' (cell is empty now)", file_name)
+        cache.save()
+        logger.info("Cells of '%s': %d written, %d unchanged", exportName, len(chunk_objects), len(cell_sources) - len(changed_cells))
+
+    def add_lightmap_uvs(self, mesh, exportName):
+        """ Adds the lightmap uv channel to the joined mesh, returns its index (None if not added) """
+        from ..utils import lightmaps
+        lightmap_index = lightmaps.add_lightmap_uvs(mesh, exportName, self.lightmap_margin)
+        objects.set_active(mesh)
+        return lightmap_index
+
+    def create_lod_group(self, mesh, exportName):
+        """ Generates the LODs of the joined mesh (cached while its geometry is unchanged), returns the group objects """
+        from ..utils import lods
+        lod_objects = lods.create_lod_group(mesh, lods.parse_lod_levels(self.lod_levels), exportName)
+        logger.info("Generated %d LODs for '%s'", len(lod_objects) - 2, exportName)
+        return lod_objects
+
+    def export_instanced_meshes(self, collection, exportName):
+        """ Exports every mesh shared by multiple objects once and writes their placements, returns the instanced objects """
+        from ..utils import instancing
+        candidates = [obj for obj in collection.all_objects
+                      if not obj.name.startswith(preferences.export_exclude_object_prefix()) and obj.display_type not in ('WIRE', 'BOUNDS')]
+        shared_meshes = instancing.find_shared_meshes(candidates)
+        if not shared_meshes:
+            return []
+
+        unit_scale = export.units_blender_to_fbx_factor()
+        instances = {}
+        for mesh, mesh_objects in shared_meshes.items():
+            # export a copy at the origin (placement is done by the instances)
+            instance = mesh_objects[0].copy()
+            instance.data = mesh.copy()
+            instance.parent = None
+            instance.matrix_world = Matrix.Identity(4)
+            instance.name = instancing.get_mesh_export_name(exportName, mesh)
+            collections.link_objects_to_collection_with_name([instance], preferences.export_collection_name())
+            objects.deselect()
+            objects.set_active(instance)
+            export_path = os.path.join(preferences.source_path(), instance.name + ".fbx")
+            export.selected_objects_as_fbx(fix_scale=self.fix_scale_on_export, export_path=export_path, native=self.native_fbx_export, validate_native=self.validate_native_fbx)
+            self.manifest.add(export_path, manifest.STATIC_MESH)
+            instances[instance.name] = [instancing.get_unreal_transform(obj, unit_scale) for obj in mesh_objects]
+            logger.info("Instanced '%s' as '%s' (%d placements)", mesh.name, instance.name, len(mesh_objects))
+
+        instancing.write_transforms(os.path.join(preferences.source_path(), exportName + INSTANCES_SUFFIX + ".json"), instances)
+        objects.deselect()
+        return [obj for mesh_objects in shared_meshes.values() for obj in mesh_objects]
+
+    def begin_export(self, context):
+        """Sets up the export of all filtered collections, returns one step per collection"""
+        # planned (and checked) in execute
+        plans = self.plans
+        export_collections = [bpy.data.collections[plan.name] for plan in plans]
+
+        self.manifest = manifest.ExportManifest()
+        self.enter_export_context(MemoryReport("Collection export"))
+        self.tracker = self.enter_export_context(DataBlockTracker())
+        # called after the export scene is removed (joined meshes stay behind as orphans otherwise)
+        self.should_purge = False
+        self.add_export_callback(self.purge_export_data)
+
+        # work in a throwaway scene so exclude/hide/selection states of the user stay untouched
+        self.export_scene = self.enter_export_context(TemporaryExportScene())
+        for plan, collection in zip(plans, export_collections):
+            self.export_scene.link_collection(collection)
+            self.export_scene.link_collection(self.get_ucx_collection(plan))
+        # only the current scene while exporting (user can inspect the file in between)
+        with self.export_scene.activated():
+            self.set_up_export_collection_with_name(preferences.export_collection_name())
+
+        steps = [(plan.name, partial(self.export_collection_in_export_scene, plan)) for plan in plans]
+        if self.export_textures:
+            steps.append(("Textures", partial(self.export_textures_of_collections, export_collections)))
+        return steps
+
+    def export_textures_of_collections(self, export_collections):
+        """Writes the images used by the materials of the collections"""
+        from ..utils import textures
+        export_objects = {obj for collection in export_collections for obj in collection.all_objects}
+        images = textures.collect_images(export_objects)
+        directory = os.path.join(preferences.source_path(), textures.TEXTURE_FOLDER)
+        written, skipped = textures.export_images(images, directory, max_size=int(self.texture_max_size))
+        logger.info("Textures: %d written, %d unchanged", written, skipped)
+
+    def export_collection_in_export_scene(self, plan):
+        """Exports a planned collection with the export scene as current scene"""
+        with self.export_scene.activated(), log.context(collection=plan.name):
+            self.export_collection(bpy.data.collections.get(plan.name), plan)
+        dirty.mark_exported(dirty.COLLECTION, plan.name)
+
+    def end_export(self, context, cancelled):
+        """Writes the manifest and removes the export collection (or keeps it for debugging)"""
+        export_manifest = getattr(self, 'manifest', None)
+        if export_manifest and not cancelled:
+            export_manifest.write()
+        export_scene = getattr(self, 'export_scene', None)
+        if not export_scene:
+            return
+        with export_scene.activated():
+            # a cancelled export is always cleaned up
+            self.should_purge = self.clean_up_export or cancelled
+            if self.should_purge:
+                if collections.has_collection_with_name(preferences.export_collection_name()):
+                    collections.delete_collection_with_name(preferences.export_collection_name())
+            else:
+                export_scene.keep_collection(bpy.data.collections.get(preferences.export_collection_name()))
+
+    def purge_export_data(self):
+        """Removes the data-blocks created by the export"""
+        if self.should_purge:
+            logger.info("Purged %d orphan data-blocks", self.tracker.purge())
 
     @classmethod
     def poll(cls, context):
         """Only allows this operator to execute if there is a valid selection."""
-        return find_exportable_collections() and bpy.data.is_saved
+        return find_exportable_collections() and bpy.data.is_saved and not modal_export.is_export_running()
     
 def menu_draw(self, context):
     """Create the menu item."""
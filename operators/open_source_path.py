@@ -4,8 +4,7 @@ import bpy
 from ..core import preferences
 import os
 import subprocess
-
-FILEBROWSER_PATH = os.path.join(os.getenv('WINDIR'), 'explorer.exe')
+import sys
 
 class OpenSourcePath(bpy.types.Operator):
     """Open the addon's output path in explorer"""
@@ -26,9 +25,20 @@ class OpenSourcePath(bpy.types.Operator):
         path = os.path.normpath(path)
 
         if os.path.isdir(path):
-            subprocess.run([FILEBROWSER_PATH, path])
+            subprocess.run(get_file_browser_command(path))
         elif os.path.isfile(path):
-            subprocess.run([FILEBROWSER_PATH, '/select,', os.path.normpath(path)])
+            subprocess.run(get_file_browser_command(path, select=True))
+
+
+def get_file_browser_command(path, select=False):
+    """Command to open the platforms file browser (resolved on use, WINDIR only exists on windows)"""
+    if sys.platform == 'win32':
+        explorer = os.path.join(os.getenv('WINDIR', 'C:\\Windows'), 'explorer.exe')
+        return [explorer, '/select,', path] if select else [explorer, path]
+    if sys.platform == 'darwin':
+        return ['open', '-R', path] if select else ['open', path]
+    # xdg-open can not select files, open the containing folder instead
+    return ['xdg-open', os.path.dirname(path) if select else path]
 
 
 def menu_draw(self, context):
@@ -1,15 +1,10 @@
-"""Open the addon's output path in explorer"""
+"""Checkout the blend file in perforce"""
 
 import bpy
-from ..core import preferences
-from ..utils import addon
-import os
-import subprocess
-
-FILEBROWSER_PATH = os.path.join(os.getenv('WINDIR'), 'explorer.exe')
+from ..utils import perforce
 
 class PerforceCheckout(bpy.types.Operator):
-    """Open the addon's output path in explorer"""
+    """Checkout the blend file in perforce"""
 
     bl_label = "P4 Checkout"
     bl_idname = "screen.ezue4_p4_checkout"
@@ -18,8 +13,7 @@ class PerforceCheckout(bpy.types.Operator):
 
     def execute(self, context):
         """Checks out the blend file"""
-        filepath = addon.get_blend_file_path()
-        subprocess.run(["p4", "edit", filepath])
+        perforce.checkout_blend_file()
         return {'FINISHED'}
 
 
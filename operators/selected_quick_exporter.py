@@ -2,11 +2,19 @@
 
 import bpy
 import os
-from bpy.props import BoolProperty, StringProperty
+import re
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, StringProperty
 from ..core import preferences
-from ..utils import collections, export, objects, modes
+from ..utils import collections, export, objects, modes, addon, log, modal_export
+from ..utils.log import logger
+from ..utils.datablocks import DataBlockTracker
+from ..utils.export_scene import TemporaryExportScene
+from ..utils.memory import MemoryReport
 from bpy_extras.io_utils import ExportHelper
 
+# object types smart_join_selected can convert to mesh
+JOINABLE_TYPES = {'MESH', 'CURVE', 'GPENCIL'}
+
 class SelectedQuickExporter(bpy.types.Operator, ExportHelper):
     """ Export collections """
     bl_idname = "screen.ezue4_export_selected"
@@ -19,6 +27,15 @@ class SelectedQuickExporter(bpy.types.Operator, ExportHelper):
     fix_scale_on_export: BoolProperty(name="Fix Scale", description="Scale x100 to fix unreal scaling issues", default=True)
     auto_uv_unwrap_export: BoolProperty(name="Auto UV Unwrap", description="Automated unwrapping after merging objects", default=True)
     clean_up_export: BoolProperty(name="Clean-Up Export", description="Clean-Up will delete the meshes generated for export", default=True)
+    consolidate_materials: BoolProperty(name="Merge Material Slots", description="Merge duplicate material slots of the joined mesh (fewer sections in unreal)", default=True)
+    weld_seams: BoolProperty(name="Weld Seams", description="Merge coincident vertices at the seams of the joined objects", default=False)
+    weld_distance: FloatProperty(name="Weld Distance", description="Vertices closer than this are merged", default=0.0001, min=0.0, precision=5, subtype='DISTANCE')
+    batch_mode: EnumProperty(name="Batch", description="Write multiple fbx files in one run", items=(
+        ('OFF', "Off", "Join the selection into one fbx"),
+        ('OBJECT', "Per Object", "One fbx per selected object"),
+        ('HIERARCHY', "Per Hierarchy", "One fbx per selected root object and its children"),
+    ), default='OFF')
+    batch_name_template: StringProperty(name="Name Template", description="File name of each batch export ($(object), $(file) and $(index) are replaced)", default="$(object)")
     exclude_none_solid: BoolProperty(name="Exclude None-Solid", description="Dont export selected WIRE or BOUNDS objects", default=True)
 
     # Override ExportHelper
@@ -37,10 +54,13 @@ class SelectedQuickExporter(bpy.types.Operator, ExportHelper):
             return {'FINISHED'}
 
         try:
-            self.export_selected()
+            if self.batch_mode == 'OFF':
+                self.export_selected()
+            else:
+                self.export_selected_batch()
         except Exception as ex: 
             self.report({'WARNING'}, "Export Failed! See console for more information")
-            print(f"Error: Failed to export, reason: {ex}")        
+            logger.exception("Failed to export, reason: %s", ex)
             
         return {'FINISHED'}     
 
@@ -53,11 +73,22 @@ class SelectedQuickExporter(bpy.types.Operator, ExportHelper):
         """ Draw export settings """        
         box = self.layout.box()
 
+        row = box.row()
+        row.prop(self, "batch_mode")
+        if self.batch_mode != 'OFF':
+            row = box.row()
+            row.prop(self, "batch_name_template")
         row = box.row()
         row.prop(self, "fix_scale_on_export")
         row = box.row()
         row.prop(self, "auto_uv_unwrap_export")
         row = box.row()
+        row.prop(self, "consolidate_materials")
+        row = box.row()
+        row.prop(self, "weld_seams")
+        if self.weld_seams:
+            row.prop(self, "weld_distance")
+        row = box.row()
         row.prop(self, "exclude_none_solid")
         row = box.row()
         row.prop(self, "clean_up_export")
@@ -69,39 +100,156 @@ class SelectedQuickExporter(bpy.types.Operator, ExportHelper):
             return
 
         self.report({'INFO'}, f"Exporting selected objects")
-        print("==========================")
-        print("Exporting: Selected objects")
-        print("==========================")
+        log.begin_run(file=addon.get_project_name())
+        logger.info("Exporting selected objects")
+
+        with MemoryReport("Quick export"), DataBlockTracker() as tracker:
+            selected_objects = objects.get_selected()
+            active_object = objects.get_active()
+            # work in a throwaway scene so the selection of the user stays untouched
+            with TemporaryExportScene() as export_scene, export_scene.activated():
+                for obj in selected_objects:
+                    export_scene.link_object(obj)
+                    objects.add_to_selection(obj)
+                if active_object in selected_objects:
+                    objects.set_active(active_object)
 
-        if self.exclude_none_solid:
-            objects.unselect_none_solid()
+                if self.exclude_none_solid:
+                    objects.unselect_none_solid()
 
-        joined_obj = objects.smart_join_selected()
-        
-        collections.create_collection(preferences.export_collection_name())
+                joined_obj = objects.smart_join_selected()
+                self.process_joined_object(joined_obj)
+                
+                collections.create_collection(preferences.export_collection_name())
 
-        # move to export collection
-        collections.move_to_collection_with_name(joined_obj, preferences.export_collection_name())
+                # move to export collection
+                collections.move_to_collection_with_name(joined_obj, preferences.export_collection_name())
 
-        # auto UV
-        if self.auto_uv_unwrap_export:
-            objects.auto_uv_selected()
+                # auto UV
+                if self.auto_uv_unwrap_export:
+                    objects.auto_uv_selected()
 
-        # export
-        export.selected_objects_as_fbx(fix_scale = self.fix_scale_on_export, export_path=self.filepath)
-        
-        if self.clean_up_export:
-            collections.delete_collection_with_name(preferences.export_collection_name())
+                # export
+                export.selected_objects_as_fbx(fix_scale = self.fix_scale_on_export, export_path=self.filepath)
+                
+                if self.clean_up_export:
+                    collections.delete_collection_with_name(preferences.export_collection_name())
+                else:
+                    export_scene.keep_collection(bpy.data.collections.get(preferences.export_collection_name()))
+            if self.clean_up_export:
+                logger.info("Purged %d orphan data-blocks", tracker.purge())
     
         self.report({'INFO'}, f"Export Completed")
-        print("==========================")
-        print("Export complete")
-        print("==========================")
+        logger.info("Export complete")
+
+    def process_joined_object(self, joined_obj):
+        """ Optional clean-up of a joined mesh (material slots and seams) """
+        if self.consolidate_materials:
+            from ..utils import materials
+            sections_before, sections_after = materials.consolidate_material_slots(joined_obj)
+            logger.info("Material sections of '%s': %d -> %d", joined_obj.name, sections_before, sections_after)
+
+        if self.weld_seams:
+            from ..utils import weld
+            logger.info("Welded '%s': %d vertices removed", joined_obj.name, weld.weld_mesh(joined_obj.data, self.weld_distance))
+
+    def get_batch_units(self, selected_objects):
+        """ (name, objects) of every file written in batch mode """
+        if self.batch_mode == 'HIERARCHY':
+            selected = set(selected_objects)
+            roots = [obj for obj in selected_objects if not self.has_selected_parent(obj, selected)]
+            units = [(root.name, [root] + objects.get_children_of(root)) for root in roots]
+        else:
+            units = [(obj.name, [obj]) for obj in selected_objects]
+        exclude_prefix = preferences.export_exclude_object_prefix()
+        units = [(name, [obj for obj in unit if obj.type in JOINABLE_TYPES and not obj.name.startswith(exclude_prefix)
+                         and not (self.exclude_none_solid and obj.display_type in ('WIRE', 'BOUNDS'))])
+                 for name, unit in units]
+        return [(name, unit) for name, unit in units if unit]
+
+    def has_selected_parent(self, obj, selected):
+        parent = obj.parent
+        while parent:
+            if parent in selected:
+                return True
+            parent = parent.parent
+        return False
+
+    def get_batch_export_name(self, name, index):
+        """ File name (without extension) of a batch export """
+        export_name = self.batch_name_template.replace("$(object)", name)
+        export_name = export_name.replace("$(file)", addon.get_project_name())
+        export_name = export_name.replace("$(index)", "{:02d}".format(index))
+        return re.sub(r'[\\/:*?"<>|]', "_", export_name)
+
+    def export_selected_batch(self):
+        """ Export every selected object (or root hierarchy) to its own FBX """
+        log.begin_run(file=addon.get_project_name())
+        directory = os.path.dirname(bpy.path.abspath(self.filepath))
+        # children are resolved in the current scene (before switching)
+        units = self.get_batch_units(objects.get_selected())
+        if not units:
+            self.report({'WARNING'}, "Nothing to export in the selection!")
+            return
+        logger.info("Batch exporting %d files to '%s'", len(units), directory)
+
+        with MemoryReport("Quick batch export"), DataBlockTracker() as tracker:
+            with TemporaryExportScene() as export_scene, export_scene.activated():
+                for _, unit in units:
+                    for obj in unit:
+                        export_scene.link_object(obj)
+                # one export collection for the whole batch
+                collections.create_collection(preferences.export_collection_name())
+
+                exports = []
+                for index, (name, unit) in enumerate(units, 1):
+                    export_name = self.get_batch_export_name(name, index)
+                    objects.select_only(unit)
+                    joined_obj = objects.smart_join_selected(export_name)
+                    if not joined_obj:
+                        continue
+                    self.process_joined_object(joined_obj)
+                    collections.move_to_collection_with_name(joined_obj, preferences.export_collection_name())
+                    if self.auto_uv_unwrap_export:
+                        objects.auto_uv_selected()
+                    exports.append((export_name, joined_obj))
+
+                # scaled once for the whole batch
+                export_scale_factor = None
+                if self.fix_scale_on_export and exports:
+                    objects.select_only(joined_obj for _, joined_obj in exports)
+                    objects.ensure_selection_has_active()
+                    export_scale_factor = export.scale_selected_for_export()
+
+                for export_name, joined_obj in exports:
+                    objects.deselect()
+                    objects.set_active(joined_obj)
+                    with log.context(object=export_name):
+                        export.selected_objects_as_stock_fbx(os.path.join(directory, export_name + ".fbx"))
+                        logger.info("Exported '%s'", export_name)
+
+                # kept objects are reverted as in the single file export (removed ones need no revert)
+                if export_scale_factor and not self.clean_up_export:
+                    objects.select_only(joined_obj for _, joined_obj in exports)
+                    objects.ensure_selection_has_active()
+                    objects.unit_scale_selected(1.0/export_scale_factor)
+                    objects.apply_scale_and_rotation_to_selected()
+
+                if self.clean_up_export:
+                    collections.delete_collection_with_name(preferences.export_collection_name())
+                else:
+                    export_scene.keep_collection(bpy.data.collections.get(preferences.export_collection_name()))
+            if self.clean_up_export:
+                logger.info("Purged %d orphan data-blocks", tracker.purge())
+
+        self.report({'INFO'}, f"Exported {len(exports)} files")
+        logger.info("Export complete")
 
     @classmethod
     def poll(cls, context):
         """Only allows this operator to execute if there is a valid selection."""
-        return objects.get_selected()
+        # shares the export collection with a running (modal) export
+        return objects.get_selected() and not modal_export.is_export_running()
     
 def menu_draw(self, context):
     """Create the menu item."""
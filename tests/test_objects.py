@@ -0,0 +1,63 @@
+""" Tests of utils/objects.py, they need bpy and are skipped outside of Blender
+
+usage: blender -b --factory-startup --python-expr "import sys, pytest; sys.exit(pytest.main(['tests']))"
+"""
+import importlib
+import os
+import sys
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ADDON_DIR))
+objects = importlib.import_module(os.path.basename(ADDON_DIR) + ".utils.objects")
+
+
+@pytest.fixture
+def scene():
+    """ Empty scene as current scene, removed with its objects afterwards """
+    scene = bpy.data.scenes.new("ezue4_test")
+    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+        yield scene
+    for obj in list(scene.objects):
+        bpy.data.objects.remove(obj)
+    bpy.data.scenes.remove(scene)
+
+def create_object(scene, name, location, parent=None):
+    obj = bpy.data.objects.new(name, None)
+    scene.collection.objects.link(obj)
+    obj.location = location
+    obj.parent = parent
+    return obj
+
+def get_world_locations(objs):
+    bpy.context.view_layer.update()
+    return [tuple(round(value, 4) for value in obj.matrix_world.translation) for obj in objs]
+
+
+def test_selected_parent_with_selected_children_is_scaled_once(scene):
+    root = create_object(scene, "Root", (1.0, 0.0, 0.0))
+    child = create_object(scene, "Child", (0.0, 2.0, 0.0), parent=root)
+    grandchild = create_object(scene, "Grandchild", (0.0, 0.0, 3.0), parent=child)
+    objects.select_only([root, child, grandchild])
+
+    objects.unit_scale_selected(100.0)
+
+    assert tuple(root.scale) == pytest.approx((100.0, 100.0, 100.0))
+    assert tuple(child.scale) == pytest.approx((1.0, 1.0, 1.0))
+    assert tuple(grandchild.scale) == pytest.approx((1.0, 1.0, 1.0))
+    assert get_world_locations([root, child, grandchild]) == [(100.0, 0.0, 0.0), (100.0, 200.0, 0.0), (100.0, 200.0, 300.0)]
+
+def test_children_of_unselected_parents_are_scaled(scene):
+    root = create_object(scene, "Root", (1.0, 0.0, 0.0))
+    child = create_object(scene, "Child", (0.0, 2.0, 0.0), parent=root)
+    single = create_object(scene, "Single", (0.0, 0.0, 3.0))
+    objects.select_only([child, single])
+
+    objects.unit_scale_selected(100.0)
+
+    assert tuple(root.scale) == pytest.approx((1.0, 1.0, 1.0))
+    assert tuple(child.scale) == pytest.approx((100.0, 100.0, 100.0))
+    assert tuple(single.scale) == pytest.approx((100.0, 100.0, 100.0))
+    assert get_world_locations([child, single]) == [(1.0, 200.0, 0.0), (0.0, 0.0, 300.0)]
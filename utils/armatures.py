@@ -1,4 +1,9 @@
 import bpy
+from . import datablocks
+
+# armature data identity -> (key, value)
+__actions_cache__ = {}
+__root_bone_count_cache__ = {}
 
 def get_actions(armature):
     if not armature or not armature.animation_data or not armature.data:
@@ -7,6 +12,40 @@ def get_actions(armature):
     return actions
 
 
+def get_actions_cached(armature):
+    """Same as get_actions, cached for the armature data and the existing actions"""
+    if not armature or not armature.animation_data or not armature.data:
+        return []
+    identity = datablocks.get_identity(armature.data)
+    key = (len(armature.data.bones), tuple(datablocks.get_identity(action) for action in bpy.data.actions))
+    cached = __actions_cache__.get(identity)
+    if cached and cached[0] == key:
+        return cached[1]
+    actions = get_actions(armature)
+    __actions_cache__[identity] = (key, actions)
+    return actions
+
+def get_root_bone_count(armature):
+    """Number of bones without parent, cached for the armature data"""
+    identity = datablocks.get_identity(armature.data)
+    key = len(armature.data.bones)
+    cached = __root_bone_count_cache__.get(identity)
+    if cached and cached[0] == key:
+        return cached[1]
+    root_bone_count = sum(1 for bone in armature.data.bones if not bone.parent)
+    __root_bone_count_cache__[identity] = (key, root_bone_count)
+    return root_bone_count
+
+def invalidate_armature(armature_data):
+    """Forget cached values of an armature (eg. bones were re-parented)"""
+    identity = datablocks.get_identity(armature_data)
+    __actions_cache__.pop(identity, None)
+    __root_bone_count_cache__.pop(identity, None)
+
+def invalidate_actions():
+    """Forget cached action listings (eg. an action got new channels)"""
+    __actions_cache__.clear()
+
 def is_armature_using_action(armature, action):
     return True if any(fc.data_path.partition('"')[2].split('"')[0] in armature.data.bones for fc in action.fcurves) else False
 
@@ -17,4 +56,44 @@ def create_animation_data(armature):
 def clear_pose_transform(armature):
     for pb in armature.pose.bones:
         pb.location, pb.scale, pb.rotation_euler = [0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [0.0, 0.0, 0.0]
-        pb.rotation_quaternion, pb.rotation_axis_angle = [1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]
\ No newline at end of file
+        pb.rotation_quaternion, pb.rotation_axis_angle = [1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]
+
+class ArmatureStateContext():
+    ''' Utility class to revert the armature (transform, action and pose) to its previous state '''
+    armature = None
+    location = None
+    scale = None
+    had_animation_data = False
+    action = None
+    pose_position = None
+    pose_transforms = None
+
+    def __init__(self, armature):
+        self.armature = armature
+
+    def __enter__(self):
+        ''' Save current armature state '''
+        armature = self.armature
+        self.location = armature.location.copy()
+        self.scale = armature.scale.copy()
+        self.had_animation_data = armature.animation_data is not None
+        self.action = armature.animation_data.action if self.had_animation_data else None
+        self.pose_position = armature.data.pose_position
+        self.pose_transforms = [(pb.location.copy(), pb.scale.copy(), pb.rotation_euler.copy(),
+                                 pb.rotation_quaternion.copy(), tuple(pb.rotation_axis_angle))
+                                for pb in armature.pose.bones]
+        return self
+
+    def __exit__(self, type, value, traceback):
+        ''' Revert armature to original '''
+        armature = self.armature
+        armature.location = self.location
+        armature.scale = self.scale
+        if self.had_animation_data:
+            armature.animation_data.action = self.action
+        elif armature.animation_data:
+            armature.animation_data_clear()
+        armature.data.pose_position = self.pose_position
+        for pb, (location, scale, rotation_euler, rotation_quaternion, rotation_axis_angle) in zip(armature.pose.bones, self.pose_transforms):
+            pb.location, pb.scale, pb.rotation_euler = location, scale, rotation_euler
+            pb.rotation_quaternion, pb.rotation_axis_angle = rotation_quaternion, rotation_axis_angle
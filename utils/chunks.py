@@ -0,0 +1,158 @@
+""" Splitting of export collections into grid cells (one fbx per non-empty cell) and change tracking of the written cells """
+import hashlib
+import json
+import os
+import bpy
+import numpy as np
+from mathutils import Vector
+from . import modes, objects
+
+OBJECT = 'OBJECT'
+FACE = 'FACE'
+CACHE_NAME = "ezue4_chunks.json"
+
+
+def get_cells(points, size):
+    """ Grid cells (x, y) of world positions (cells are columns, height is not split) """
+    return np.floor(np.asarray(points, dtype=np.float64).reshape(-1, 3)[:, :2] / size).astype(np.int64)
+
+def format_coordinate(value):
+    # '-' is not allowed in unreal asset names
+    return f"n{-value}" if value < 0 else str(value)
+
+def get_chunk_name(export_name, cell):
+    """ Export name of a cell (eg. Terrain_X0_Yn1) """
+    return f"{export_name}_X{format_coordinate(cell[0])}_Y{format_coordinate(cell[1])}"
+
+def get_object_center(obj):
+    """ World space center of the bounding box """
+    return obj.matrix_world @ (sum((Vector(corner) for corner in obj.bound_box), Vector()) / 8.0)
+
+def group_objects_by_cell(objs, size):
+    """ Objects per cell of their bounding box center """
+    objs = list(objs)
+    if not objs:
+        return {}
+    groups = {}
+    for obj, cell in zip(objs, get_cells([get_object_center(obj) for obj in objs], size).tolist()):
+        groups.setdefault(tuple(cell), []).append(obj)
+    return groups
+
+def get_face_cells(mesh, matrix_world, size):
+    """ Cells of the face centers of a mesh placed with the matrix """
+    centers = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get('center', centers)
+    matrix = np.array(matrix_world, dtype=np.float64)
+    return get_cells(centers.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3], size)
+
+def get_evaluated_face_cells(obj, size, depsgraph):
+    """ Cells of the face centers of an object as it gets joined (modifiers applied, curves as mesh) """
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        if mesh is None:
+            return np.empty((0, 2), dtype=np.int64)
+        return get_face_cells(mesh, obj.matrix_world, size)
+    finally:
+        evaluated.to_mesh_clear()
+
+def group_objects_by_face_cells(objs, size, depsgraph):
+    """ Objects per cell their faces end up in (an object can be in multiple cells) """
+    groups = {}
+    for obj in objs:
+        for cell in np.unique(get_evaluated_face_cells(obj, size, depsgraph), axis=0).tolist():
+            groups.setdefault(tuple(cell), []).append(obj)
+    return groups
+
+def split_by_face_centroid(obj, size):
+    """ Separates the faces of the object into one object per cell of their centers, returns {cell: object}
+
+    The cells are computed once and all cells are separated in one edit mode session,
+    every face is copied once (the object keeps the faces of the last cell).
+    """
+    import bmesh
+    cells = get_face_cells(obj.data, obj.matrix_world, size)
+    if not len(cells):
+        return {}
+    unique_cells, labels = np.unique(cells, axis=0, return_inverse=True)
+    labels = labels.ravel()
+    unique_cells = [tuple(cell) for cell in unique_cells.tolist()]
+    parts = {unique_cells[-1]: obj}
+    if len(unique_cells) == 1:
+        return parts
+
+    # face indices grouped by cell
+    order = np.argsort(labels, kind='stable')
+    bounds = np.searchsorted(labels[order], np.arange(len(unique_cells) + 1))
+    objects.select_only([obj])
+    objects.set_active(obj)
+    modes.switch_to_edit()
+    try:
+        bm = bmesh.from_edit_mesh(obj.data)
+        bm.faces.ensure_lookup_table()
+        # references stay valid while faces of other cells are separated (indices do not)
+        cell_faces = [[bm.faces[index] for index in order[bounds[label]:bounds[label + 1]].tolist()]
+                      for label in range(len(unique_cells) - 1)]
+        for cell, faces in zip(unique_cells, cell_faces):
+            bpy.ops.mesh.select_all(action='DESELECT')
+            for face in faces:
+                face.select_set(True)
+            bpy.ops.mesh.separate(type='SELECTED')
+            part = next(part for part in objects.get_selected() if part != obj)
+            part.select_set(False)
+            parts[cell] = part
+    finally:
+        modes.switch_to_object()
+    return parts
+
+def get_cell_key(objs, settings):
+    """ Hash of the source objects of a cell (placement, materials, modifiers and geometry) and the export settings, None if not comparable """
+    from . import dirty
+    signatures = [dirty.get_object_signature(obj) for obj in objs]
+    if any(signature is None for signature in signatures):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    # independent of the selection order
+    for signature in sorted(repr(signature) for signature in signatures):
+        digest.update(signature.encode())
+    digest.update(repr(settings).encode())
+    return digest.hexdigest()
+
+
+class ChunkCache():
+    ''' Keys of the chunk files written for an export (stored next to the fbx files) '''
+    directory = None
+    export_name = None
+    previous = None
+    current = None
+
+    def __init__(self, directory, export_name):
+        self.directory = directory
+        self.export_name = export_name
+        # file name -> chunk key
+        self.previous = self.load().get(export_name, {})
+        self.current = {}
+
+    def load(self):
+        path = os.path.join(self.directory, CACHE_NAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+
+    def is_unchanged(self, file_name, key):
+        ''' If the file was written with the same key and still exists '''
+        return key is not None and self.previous.get(file_name) == key and os.path.exists(os.path.join(self.directory, file_name))
+
+    def record(self, file_name, key):
+        self.current[file_name] = key
+
+    def get_stale(self):
+        ''' Files of cells that are empty now '''
+        return [file_name for file_name in self.previous if file_name not in self.current]
+
+    def save(self):
+        cache = self.load()
+        cache[self.export_name] = self.current
+        with open(os.path.join(self.directory, CACHE_NAME), 'w') as file:
+            json.dump(cache, file, indent=2)
@@ -23,12 +23,21 @@ def find_layer_collection_with_name(name):
     root = bpy.context.view_layer.layer_collection
     return recur_layer_collection_with_name(root, name)
 
+def get_layer_collections_by_name():
+    """ All layer collections of the view layer by name (one traversal instead of a search per name) """
+    layer_collections = {}
+    stack = [bpy.context.view_layer.layer_collection]
+    while stack:
+        layer_collection = stack.pop()
+        layer_collections[layer_collection.name] = layer_collection
+        stack.extend(layer_collection.children)
+    return layer_collections
+
 def select_objects_of_collection(collection):
     """ Select all Objects of a collection """
-    bpy.ops.object.select_all(action='DESELECT')
-    for obj in collection.all_objects:
-        if obj and (obj.type == 'MESH' or obj.type == 'CURVE' or obj.type == 'GPENCIL'):
-            obj.select_set(True)
+    from . import objects
+    objects.select_only(obj for obj in collection.all_objects
+                        if obj and (obj.type == 'MESH' or obj.type == 'CURVE' or obj.type == 'GPENCIL'))
 
 def select_objects_of_collection_with_name(collectionName):
     """ Select all Objects of a collection by name"""
@@ -42,21 +51,39 @@ def move_to_collection(object, collection):
     collection.objects.link(object)
 
 def move_to_collection_with_name(object, collectionName):     
-    for collection in object.users_collection:
-        collection.objects.unlink(object)
-    bpy.data.collections[collectionName].objects.link(object)
+    move_objects_to_collection_with_name([object], collectionName)
+
+def move_objects_to_collection_with_name(objects, collectionName):
+    """ Move a batch of objects to a collection (objects already in it are not relinked) """
+    target = bpy.data.collections[collectionName]
+    target_objects = target.objects
+    for obj in objects:
+        for collection in obj.users_collection:
+            if collection != target:
+                collection.objects.unlink(obj)
+        if obj.name not in target_objects:
+            target_objects.link(obj)
+
+def link_objects_to_collection_with_name(objects, collectionName):
+    """ Link new objects (not in any collection yet) to a collection """
+    target_objects = bpy.data.collections[collectionName].objects
+    for obj in objects:
+        target_objects.link(obj)
 
 def delete_collection(collection):
     """ Deletes a collection with the objects in it """
     if not collection:
         return
     # delete objects of collection
-    bpy.ops.object.select_all(action='DESELECT')
-    select_objects_of_collection(collection)
-    bpy.ops.object.delete()
+    delete_objects_of_collection(collection)
 
     bpy.data.collections.remove(collection)
 
+def delete_objects_of_collection(collection):
+    """ Deletes the objects of a collection (without selecting them) """
+    for obj in list(collection.all_objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+
 def delete_collection_with_name(collectionName):
     """ Deletes a collection by name with the objects in it """
     collection = bpy.data.collections[collectionName]
@@ -83,8 +110,11 @@ def create_collection(collectionName):
     """ Creates a collection if it dose not exist """
     # create Export Collection if not exist
     if not has_collection_with_name(collectionName):
-        collection = bpy.data.collections.new(collectionName)
-        bpy.context.scene.collection.children.link(collection)
+        bpy.data.collections.new(collectionName)
+
+    # link to the current scene (could be left over in another scene)
+    if not find_layer_collection_with_name(collectionName):
+        bpy.context.scene.collection.children.link(bpy.data.collections[collectionName])
     
     # make shure the collection is included
     find_layer_collection_with_name(collectionName).exclude = False
\ No newline at end of file
@@ -0,0 +1,94 @@
+""" Generated convex hull collision (UCX) for collections without hand-made collision """
+import bmesh
+import bpy
+import numpy as np
+from . import meshes
+from .log import logger
+from .mesh_cache import MeshCache
+
+NONE = 'NONE'
+HULL = 'HULL'
+DECOMPOSE = 'DECOMPOSE'
+
+KMEANS_ITERATIONS = 16
+
+# hull meshes per export name, keyed by the geometry hash of the source (and the settings)
+__hull_cache__ = MeshCache()
+
+
+def get_polygon_centers(mesh):
+    """ Centers of all polygons as (n, 3) array """
+    centers = np.empty(len(mesh.polygons) * 3, dtype=np.float32)
+    mesh.polygons.foreach_get('center', centers)
+    return centers.reshape(-1, 3)
+
+def get_polygon_vertex_indices(mesh):
+    """ Vertex indices of the loops and the polygon index of each loop """
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_vertices)
+    loop_polygons = np.repeat(np.arange(len(mesh.polygons)), meshes.get_loop_totals(mesh))
+    return loop_vertices, loop_polygons
+
+def cluster_points(points, count):
+    """ Deterministic k-means (farthest point initialisation), returns the cluster label of each point """
+    count = min(count, len(points))
+    centers = [points[0]]
+    distances = np.linalg.norm(points - points[0], axis=1)
+    for _ in range(1, count):
+        centers.append(points[np.argmax(distances)])
+        distances = np.minimum(distances, np.linalg.norm(points - centers[-1], axis=1))
+    centers = np.array(centers)
+    labels = np.zeros(len(points), dtype=np.int64)
+    for _ in range(KMEANS_ITERATIONS):
+        # squared distances without a (points, centers, 3) temporary
+        labels = np.argmin((centers ** 2).sum(axis=1)[None, :] - 2.0 * points @ centers.T, axis=1)
+        for i in range(count):
+            members = points[labels == i]
+            if len(members):
+                centers[i] = members.mean(axis=0)
+    return labels
+
+def get_hull_point_sets(mesh, mode, max_hulls):
+    """ Vertex positions of each hull """
+    positions = meshes.get_vertex_positions(mesh)
+    if mode != DECOMPOSE or max_hulls <= 1 or len(mesh.polygons) <= max_hulls:
+        return [positions]
+    # split by polygons, the vertices of a polygon go to its cluster
+    labels = cluster_points(get_polygon_centers(mesh), max_hulls)
+    loop_vertices, loop_polygons = get_polygon_vertex_indices(mesh)
+    loop_labels = labels[loop_polygons]
+    return [positions[np.unique(loop_vertices[loop_labels == label])] for label in np.unique(labels)]
+
+def create_hull_mesh(points, name):
+    """ Mesh of the convex hull of the points (None if degenerated) """
+    if len(points) < 4:
+        return None
+    bm = bmesh.new()
+    try:
+        for point in points:
+            bm.verts.new(point)
+        result = bmesh.ops.convex_hull(bm, input=bm.verts)
+        bmesh.ops.delete(bm, geom=result['geom_interior'] + result['geom_unused'], context='VERTS')
+        if len(bm.faces) < 4:
+            # flat (no volume)
+            return None
+        mesh = bpy.data.meshes.new(name)
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+    return mesh
+
+def get_hull_meshes(obj, mode, max_hulls, owner):
+    """ Convex hull meshes of the object, reused while the source geometry is unchanged (do not modify, copy them) """
+    key = (meshes.get_geometry_hash(obj.data), mode, max_hulls)
+    cached = __hull_cache__.lookup(owner, key, None)
+    if cached is not None:
+        logger.debug("Reusing cached collision of '%s'", owner)
+        return cached
+    hull_meshes = []
+    for points in get_hull_point_sets(obj.data, mode, max_hulls):
+        mesh = create_hull_mesh(points, f"{owner}_HULL")
+        if mesh:
+            hull_meshes.append(mesh)
+    __hull_cache__.store(owner, key, None, hull_meshes)
+    return hull_meshes
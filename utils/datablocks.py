@@ -0,0 +1,89 @@
+import bpy
+
+# bpy.data collections that can receive data-blocks created by an export
+TRACKED_DATA = (
+    'objects',
+    'meshes',
+    'curves',
+    'materials',
+    'images',
+    'textures',
+    'node_groups',
+    'grease_pencils',
+    'actions',
+)
+
+# data-blocks that are kept alive between exports on purpose (eg. caches)
+__protected__ = set()
+
+def get_identity(id):
+    """ Identity of a data-block that survives renames """
+    # session_uid is not reused inside a session (pointers could be)
+    session_uid = getattr(id, 'session_uid', None)
+    if session_uid is not None:
+        return session_uid
+    return id.as_pointer()
+
+def protect(id):
+    """ Excludes a data-block from being purged (eg. cached export data) """
+    if id:
+        __protected__.add(get_identity(id))
+
+def unprotect(id):
+    """ Allows a data-block to be purged again """
+    if id:
+        __protected__.discard(get_identity(id))
+
+def iter_tracked_data():
+    """ Yields all bpy.data collections that are tracked """
+    for data_name in TRACKED_DATA:
+        data = getattr(bpy.data, data_name, None)
+        if data is not None:
+            yield data_name, data
+
+def count_orphans():
+    """ Counts data-blocks without any users """
+    count = 0
+    for _, data in iter_tracked_data():
+        for id in data:
+            if id.users == 0 and not id.use_fake_user:
+                count += 1
+    return count
+
+
+class DataBlockTracker():
+    ''' Utility class to track (and purge) the data-blocks created while exporting '''
+    known = None
+
+    def __enter__(self):
+        ''' Remember the data-blocks that existed before the export '''
+        self.known = set()
+        for _, data in iter_tracked_data():
+            for id in data:
+                self.known.add(get_identity(id))
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def created(self):
+        ''' Data-blocks that have been created since entering '''
+        created = []
+        for data_name, data in iter_tracked_data():
+            for id in data:
+                if get_identity(id) not in self.known:
+                    created.append((data_name, id))
+        return created
+
+    def purge(self):
+        ''' Removes the created data-blocks that are no longer used, returns the removed count '''
+        removed = 0
+        # removing a mesh can free its materials, so repeat until nothing changes
+        while True:
+            orphans = [(data_name, id) for data_name, id in self.created()
+                       if id.users == 0 and get_identity(id) not in __protected__]
+            if not orphans:
+                return removed
+            for data_name, id in orphans:
+                getattr(bpy.data, data_name).remove(id)
+                removed += 1
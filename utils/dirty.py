@@ -0,0 +1,223 @@
+""" Tracks which export collections and armatures were modified since their last export """
+import bpy
+from bpy.app.handlers import persistent
+
+COLLECTION = 'COLLECTION'
+ARMATURE = 'ARMATURE'
+
+# (kind, name) of everything exported and not modified since
+__clean__ = set()
+# (kind, name) -> signature of the exported state, compared once after it got marked dirty
+# (depsgraph updates caused by the export itself or undone edits leave the signature unchanged)
+__exported__ = {}
+# object/data name -> set of (kind, name) it is exported with
+__owners__ = None
+
+
+def is_dirty(kind, name):
+    """ If the export collection or armature was modified since its last export (or never exported) """
+    key = (kind, name)
+    if key in __clean__:
+        return False
+    # only compared once per modification (the signature hashes the geometry)
+    exported = __exported__.pop(key, None)
+    if exported is not None and exported == get_signature(kind, name):
+        __clean__.add(key)
+        __exported__[key] = exported
+        return False
+    return True
+
+def get_dirty_collections():
+    """ Export collections that were modified since their last export """
+    from ..core import find_exportable_collections
+    return [c for c in find_exportable_collections() if is_dirty(COLLECTION, c.name)]
+
+def get_dirty_armatures():
+    """ Export armatures that were modified since their last export """
+    from ..core import find_exportable_armatures
+    return [a for a in find_exportable_armatures() if is_dirty(ARMATURE, a.name)]
+
+def mark_exported(kind, name):
+    """ Marks as clean and remembers the exported state """
+    __clean__.add((kind, name))
+    signature = get_signature(kind, name)
+    if signature is None:
+        __exported__.pop((kind, name), None)
+    else:
+        __exported__[(kind, name)] = signature
+
+def mark_dirty(kind, name):
+    __clean__.discard((kind, name))
+
+def reset():
+    """ Everything is dirty (eg. after loading another file) """
+    global __owners__
+    __clean__.clear()
+    __exported__.clear()
+    __owners__ = None
+
+def invalidate_owners():
+    """ Rebuild the object to owner mapping on next use (hierarchy changed) """
+    global __owners__
+    __owners__ = None
+
+def __get_comparable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bpy.types.ID):
+        return value.name
+    try:
+        # vectors and arrays (their repr is the data path)
+        return tuple(value)
+    except TypeError:
+        return repr(value)
+
+def get_modifier_signature(modifier):
+    # all editable settings (objects are compared by name)
+    return tuple((prop.identifier, __get_comparable(getattr(modifier, prop.identifier)))
+                 for prop in modifier.bl_rna.properties if not prop.is_readonly)
+
+def get_object_signature(obj):
+    """ State of an object that ends up in the export (None if it can not be compared, eg. curves) """
+    from . import meshes
+    values = [
+        obj.name,
+        obj.parent.name if obj.parent else None,
+        tuple(value for row in obj.matrix_world for value in row),
+        obj.display_type,
+        tuple(slot.material.name if slot.material else "" for slot in obj.material_slots),
+        tuple(get_modifier_signature(modifier) for modifier in obj.modifiers),
+    ]
+    if obj.type == 'MESH':
+        values.append(meshes.get_geometry_hash(obj.data))
+    elif obj.type == 'ARMATURE':
+        values.append(tuple(tuple(bone.head_local) + tuple(bone.tail_local) + (bone.parent.name if bone.parent else None,)
+                            for bone in obj.data.bones))
+    elif obj.type != 'EMPTY':
+        return None
+    return tuple(values)
+
+def get_action_signature(action):
+    import numpy as np
+    values = []
+    for fcurve in action.fcurves:
+        keys = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get('co', keys)
+        values.append((fcurve.data_path, fcurve.array_index, keys.tobytes()))
+    return (action.name, tuple(values))
+
+def get_signature(kind, name):
+    """ State of an export collection (with its ucx) or armature (with children and actions), None if not comparable """
+    from ..core import preferences
+    from . import armatures, objects
+    if kind == COLLECTION:
+        collection = bpy.data.collections.get(name)
+        if not collection:
+            return None
+        export_objects = list(collection.all_objects)
+        ucx_collection = bpy.data.collections.get(preferences.collision_prefix() + name.removeprefix(preferences.export_prefix()))
+        if ucx_collection:
+            export_objects += ucx_collection.all_objects
+        extra = ()
+    else:
+        armature = bpy.data.objects.get(name)
+        if not armature:
+            return None
+        export_objects = [armature] + objects.get_children_of(armature)
+        extra = tuple(get_action_signature(action) for action in armatures.get_actions_cached(armature))
+    signatures = tuple(get_object_signature(obj) for obj in sorted(export_objects, key=lambda obj: obj.name))
+    if None in signatures:
+        return None
+    return signatures + extra
+
+def __get_owners():
+    global __owners__
+    if __owners__ is None:
+        __owners__ = __build_owners()
+    return __owners__
+
+def __build_owners():
+    from ..core import find_exportable_collections, find_exportable_armatures, preferences
+    from . import objects
+
+    owners = {}
+    def add(obj, key):
+        owners.setdefault(obj.name, set()).add(key)
+        if obj.data:
+            owners.setdefault(obj.data.name, set()).add(key)
+
+    for collection in find_exportable_collections():
+        for obj in collection.all_objects:
+            add(obj, (COLLECTION, collection.name))
+    # ucx collections belong to the export collection with the same name
+    for collection in bpy.data.collections:
+        if collection.name.startswith(preferences.collision_prefix()):
+            owner = preferences.export_prefix() + collection.name.removeprefix(preferences.collision_prefix())
+            for obj in collection.all_objects:
+                add(obj, (COLLECTION, owner))
+    for armature in find_exportable_armatures():
+        add(armature, (ARMATURE, armature.name))
+        for child in objects.get_children_of(armature):
+            add(child, (ARMATURE, armature.name))
+    return owners
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    """ Maps updated data-blocks back to the export collections and armatures owning them """
+    from .export_scene import EXPORT_SCENE_NAME
+    if scene.name == EXPORT_SCENE_NAME:
+        return
+    for update in depsgraph.updates:
+        id = update.id.original
+        if isinstance(id, (bpy.types.Collection, bpy.types.Scene)):
+            # objects could have been moved between collections
+            invalidate_owners()
+            if isinstance(id, bpy.types.Collection):
+                mark_dirty(COLLECTION, id.name)
+            continue
+        if isinstance(id, bpy.types.Action):
+            from . import armatures
+            from ..core import find_exportable_armatures
+            armatures.invalidate_actions()
+            for armature in find_exportable_armatures():
+                if armatures.is_armature_using_action(armature, id):
+                    mark_dirty(ARMATURE, armature.name)
+            continue
+        if isinstance(id, bpy.types.Armature):
+            from . import armatures
+            armatures.invalidate_armature(id)
+        if isinstance(id, bpy.types.Mesh) and update.is_updated_geometry:
+            from . import validation
+            validation.invalidate_mesh(id)
+        for key in __get_owners().get(id.name, ()):
+            mark_dirty(*key)
+
+@persistent
+def on_load(dummy):
+    reset()
+
+@persistent
+def export_dirty_on_save(filepath=None, *args):
+    """ Exports only the modified collections and armatures before saving
+
+    Runs before the save (save_pre): the temporary export data is removed again before the file
+    is written, so the saved file is not modified afterwards. The exports are called without undo push.
+    """
+    from ..core import preferences
+    from . import modal_export
+    if not preferences.export_on_save():
+        return
+    if modal_export.is_export_running():
+        # exported with the next save (the running export uses the export scene and collection)
+        return
+    if not bpy.data.is_saved:
+        # the export path is relative to the file, exported with the next save
+        return
+    if isinstance(filepath, str) and filepath and bpy.path.abspath(filepath) != bpy.data.filepath:
+        # saved as another file (newer blender versions pass the path), exported with the next save
+        return
+    if get_dirty_collections():
+        bpy.ops.screen.ezue4_export('EXEC_DEFAULT', False, only_dirty=True, use_modal=False)
+    if get_dirty_armatures():
+        bpy.ops.screen.ezue4_animation_export('EXEC_DEFAULT', False, only_dirty=True, use_modal=False)
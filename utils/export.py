@@ -1,5 +1,7 @@
 import bpy
 import os
+import re
+from .log import logger
 
 def units_blender_to_fbx_factor():
     """Use scene to determine the scale factor for unreal export"""
@@ -9,15 +11,33 @@ def units_blender_to_fbx_factor():
 
 
 
-def selected_objects_as_fbx(fix_scale, export_path):
-    """ Exports selected objects as fbx """
+def selected_objects_as_fbx(fix_scale, export_path, native=False, validate_native=False):
+    """ Exports selected objects as fbx (native uses the streaming writer for static meshes) """
     from . import objects
 
     if fix_scale:
         # scale to fix ue4 scaling issues
-        export_scale_factor = units_blender_to_fbx_factor()
-        objects.unit_scale_selected(export_scale_factor)
+        export_scale_factor = scale_selected_for_export()
+    if native and write_native_fbx(objects.get_selected(), export_path):
+        if validate_native:
+            validate_native_fbx(export_path)
+    else:
+        selected_objects_as_stock_fbx(export_path)
+    if fix_scale:
+        # revert the scaling (for better debugging and ucx was scaled as well)
+        objects.unit_scale_selected(1.0/export_scale_factor)
         objects.apply_scale_and_rotation_to_selected()
+
+def scale_selected_for_export():
+    """ Scales the selected objects to unreal units and applies scale and rotation, returns the factor """
+    from . import objects
+    export_scale_factor = units_blender_to_fbx_factor()
+    objects.unit_scale_selected(export_scale_factor)
+    objects.apply_scale_and_rotation_to_selected()
+    return export_scale_factor
+
+def selected_objects_as_stock_fbx(export_path):
+    """ Exports selected objects with the stock fbx exporter """
     bpy.ops.export_scene.fbx(filepath=export_path, 
         use_selection=True,            
         apply_scale_options='FBX_SCALE_ALL', 
@@ -25,7 +45,66 @@ def selected_objects_as_fbx(fix_scale, export_path):
         bake_space_transform=False,
         global_scale= 1.0,
         mesh_smooth_type="EDGE")
-    if fix_scale:
-        # revert the scaling (for better debugging and ucx was scaled as well)
-        objects.unit_scale_selected(1.0/export_scale_factor)
-        objects.apply_scale_and_rotation_to_selected()
\ No newline at end of file
+
+def write_native_fbx(objs, export_path):
+    """ Writes the objects with the streaming fbx writer, returns False if not supported """
+    from . import fbx_writer
+    if not fbx_writer.is_supported(objs):
+        logger.info("Native FBX writer does not support the selection, using stock exporter")
+        return False
+    fbx_writer.write_objects(objs, export_path, global_scale=units_blender_to_fbx_factor())
+    return True
+
+def validate_native_fbx(export_path):
+    """ Exports the selection with the stock exporter and compares both by re-importing them """
+    import tempfile
+    stock_path = os.path.join(tempfile.gettempdir(), "ezue4_stock_" + os.path.basename(export_path))
+    selected_objects_as_stock_fbx(stock_path)
+    native_stats = imported_fbx_stats(export_path)
+    stock_stats = imported_fbx_stats(stock_path)
+    os.remove(stock_path)
+
+    problems = []
+    for name in sorted(set(native_stats) | set(stock_stats)):
+        native, stock = native_stats.get(name), stock_stats.get(name)
+        if native is None or stock is None:
+            problems.append(f"'{name}' is missing in the {'native' if native is None else 'stock'} export")
+            continue
+        for key in ('vertices', 'polygons', 'uv_layers', 'materials'):
+            if native[key] != stock[key]:
+                problems.append(f"'{name}' {key}: native {native[key]} != stock {stock[key]}")
+        if any(abs(a - b) > 1e-3 * max(1.0, abs(b)) for a, b in zip(native['dimensions'], stock['dimensions'])):
+            problems.append(f"'{name}' dimensions: native {native['dimensions']} != stock {stock['dimensions']}")
+
+    if problems:
+        logger.warning("Native FBX validation failed for '%s':", export_path)
+        for problem in problems:
+            logger.warning("  %s", problem)
+    else:
+        logger.info("Native FBX validation passed for '%s'", export_path)
+    return not problems
+
+def imported_fbx_stats(path):
+    """ Imports a fbx and returns mesh statistics per object name (imported data is removed again) """
+    from .datablocks import DataBlockTracker
+    from .selection_context import SelectionContext
+
+    stats = {}
+    with SelectionContext(), DataBlockTracker() as tracker:
+        bpy.ops.import_scene.fbx(filepath=path)
+        imported = [id for data_name, id in tracker.created() if data_name == 'objects']
+        for obj in imported:
+            if obj.type != 'MESH':
+                continue
+            # imported names collide with the exported objects, only blender's duplicate suffix is dropped (eg. SM_Door.L.001)
+            stats[re.sub(r'\.\d{3}$', '', obj.name)] = {
+                'vertices': len(obj.data.vertices),
+                'polygons': len(obj.data.polygons),
+                'uv_layers': len(obj.data.uv_layers),
+                'materials': len(obj.material_slots),
+                'dimensions': tuple(round(value, 4) for value in obj.dimensions),
+            }
+        for obj in imported:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        tracker.purge()
+    return stats
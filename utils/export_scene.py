@@ -0,0 +1,77 @@
+import bpy
+from contextlib import contextmanager
+
+EXPORT_SCENE_NAME = "EZ-UE4-Export-Scene"
+
+# # example usage:
+# with TemporaryExportScene() as export_scene:
+#   export_scene.link_collection(collection)
+#   method_that_exports()
+
+class TemporaryExportScene():
+    ''' Utility class to export from a throwaway scene, so the users scene and view layer stay untouched
+
+    The export scene is only the current scene inside activated() (also without a window, eg. in background mode).
+    '''
+    scene = None
+    original_scene = None
+    kept_collections = None
+
+    def __enter__(self):
+        ''' Create the export scene '''
+        self.original_scene = bpy.context.scene
+        self.kept_collections = []
+        self.scene = bpy.data.scenes.new(EXPORT_SCENE_NAME)
+        self.copy_scene_settings(self.original_scene, self.scene)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        ''' Remove the export scene '''
+        for collection in self.kept_collections:
+            if collection.name not in self.original_scene.collection.children:
+                self.original_scene.collection.children.link(collection)
+        bpy.data.scenes.remove(self.scene)
+
+    def copy_scene_settings(self, source, target):
+        ''' Copies the settings the export depends on (units and frame range) '''
+        target.unit_settings.system = source.unit_settings.system
+        target.unit_settings.scale_length = source.unit_settings.scale_length
+        target.unit_settings.length_unit = source.unit_settings.length_unit
+        target.frame_start = source.frame_start
+        target.frame_end = source.frame_end
+        target.render.fps = source.render.fps
+        target.render.fps_base = source.render.fps_base
+
+    @contextmanager
+    def activated(self):
+        ''' Makes the export scene the current scene (and view layer) while inside the with block '''
+        if hasattr(bpy.context, 'temp_override'):
+            # the window keeps showing the users scene
+            with bpy.context.temp_override(scene=self.scene, view_layer=self.scene.view_layers[0]):
+                yield self.scene
+            return
+        # before blender 3.2 only the scene of the window can be switched (no window in background mode)
+        window = bpy.context.window
+        if not window:
+            raise RuntimeError("Exporting without a window requires Blender 3.2 or newer")
+        previous_scene = window.scene
+        window.scene = self.scene
+        try:
+            yield self.scene
+        finally:
+            window.scene = previous_scene
+
+    def link_collection(self, collection):
+        ''' Makes a collection (and its objects) available in the export scene '''
+        if collection and collection.name not in self.scene.collection.children:
+            self.scene.collection.children.link(collection)
+
+    def link_object(self, obj):
+        ''' Makes an object available in the export scene '''
+        if obj and obj.name not in self.scene.collection.objects:
+            self.scene.collection.objects.link(obj)
+
+    def keep_collection(self, collection):
+        ''' Keeps a collection of the export scene in the original scene (eg. for debugging) '''
+        if collection:
+            self.kept_collections.append(collection)
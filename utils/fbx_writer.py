@@ -0,0 +1,419 @@
+""" Streaming binary FBX (7.4) writer for static meshes
+
+Writes vertex, index, normal, uv and material arrays of mesh objects straight
+into binary FBX nodes (zlib compressed) without going through the selection
+machinery of the stock exporter. Anything else (armatures, empties, shape keys,
+empty material slots) is not supported, use is_supported() to fall back.
+"""
+import bpy
+import struct
+import zlib
+import numpy as np
+
+FBX_VERSION = 7400
+
+# magic values, matching the stock exporter so the file validates
+_HEAD_MAGIC = b'Kaydara FBX Binary\x20\x20\x00\x1a\x00'
+_FOOT_ID = b'\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e'
+_FOOT_MAGIC = b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b'
+_FILE_ID = b'\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1'
+_TIME_ID = b'1970-01-01 10:00:00:000'
+_BLOCK_SENTINEL = b'\0' * 13
+# nodes closed with a sentinel even without children (as the stock exporter does)
+_ALWAYS_BLOCK_SENTINEL = {b'AnimationStack', b'AnimationLayer'}
+
+# axes of the stock exporter call (its defaults), the conversion is applied to the model transforms
+# as the stock exporter does without bake_space_transform (mesh data stays in blender axes)
+AXIS_FORWARD = '-Z'
+AXIS_UP = 'Y'
+
+# arrays smaller than this are not worth compressing
+_COMPRESSION_THRESHOLD = 128
+_COMPRESSION_LEVEL = 1
+
+_ARRAY_TYPES = {
+    np.dtype(np.float64): b'd',
+    np.dtype(np.float32): b'f',
+    np.dtype(np.int64): b'l',
+    np.dtype(np.int32): b'i',
+    np.dtype(np.bool_): b'b',
+}
+
+
+def int32(value):
+    return b'I' + struct.pack('<i', value)
+
+def int64(value):
+    return b'L' + struct.pack('<q', value)
+
+def float64(value):
+    return b'D' + struct.pack('<d', value)
+
+def boolean(value):
+    return b'C' + (b'\x01' if value else b'\x00')
+
+def string(value):
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return b'S' + struct.pack('<I', len(value)) + value
+
+def raw(value):
+    return b'R' + struct.pack('<I', len(value)) + value
+
+def array(values):
+    """ Encodes a numpy array as (compressed) fbx array property """
+    values = np.ascontiguousarray(values)
+    data = values.tobytes()
+    encoding = 0
+    if len(data) > _COMPRESSION_THRESHOLD:
+        data = zlib.compress(data, _COMPRESSION_LEVEL)
+        encoding = 1
+    return _ARRAY_TYPES[values.dtype] + struct.pack('<III', len(values), encoding, len(data)) + data
+
+def object_name(name, class_name):
+    """ Fbx object names carry their class separated by \\x00\\x01 """
+    return string(name.encode('utf-8') + b'\x00\x01' + class_name)
+
+
+class FBXStreamWriter():
+    ''' Writes fbx nodes directly to a file, patching the node offsets afterwards '''
+    file = None
+    _open_nodes = None
+
+    def __init__(self, file):
+        self.file = file
+        self._open_nodes = []
+
+    def write_header(self):
+        self.file.write(_HEAD_MAGIC)
+        self.file.write(struct.pack('<I', FBX_VERSION))
+
+    def write_footer(self):
+        file = self.file
+        file.write(_BLOCK_SENTINEL)
+        file.write(_FOOT_ID)
+        file.write(b'\x00\x00\x00\x00')
+        offset = file.tell()
+        padding = ((offset + 15) & ~15) - offset
+        file.write(b'\0' * (padding or 16))
+        file.write(struct.pack('<I', FBX_VERSION))
+        file.write(b'\0' * 120)
+        file.write(_FOOT_MAGIC)
+
+    def begin(self, name, *props):
+        """ Starts a node, children can be written until end() is called """
+        if self._open_nodes:
+            self._open_nodes[-1][2] = True
+        file = self.file
+        start = file.tell()
+        file.write(struct.pack('<IIIB', 0, len(props), 0, len(name)))
+        file.write(name)
+        props_start = file.tell()
+        for prop in props:
+            file.write(prop)
+        props_length = file.tell() - props_start
+        # [start, props_length, has_children (or always closed by a sentinel), has_props]
+        self._open_nodes.append([start, props_length, name in _ALWAYS_BLOCK_SENTINEL, bool(props)])
+
+    def end(self):
+        """ Ends the current node and patches its header """
+        file = self.file
+        start, props_length, has_children, has_props = self._open_nodes.pop()
+        if has_children or not has_props:
+            file.write(_BLOCK_SENTINEL)
+        end = file.tell()
+        file.seek(start)
+        file.write(struct.pack('<I', end))
+        file.seek(start + 8)
+        file.write(struct.pack('<I', props_length))
+        file.seek(end)
+
+    def leaf(self, name, *props):
+        """ Writes a node without children """
+        self.begin(name, *props)
+        self.end()
+
+    def properties70(self, *properties):
+        """ Writes a Properties70 node from (name, type, label, flags, *values) tuples """
+        self.begin(b'Properties70')
+        for name, type_name, label, flags, *values in properties:
+            self.leaf(b'P', string(name), string(type_name), string(label), string(flags), *values)
+        self.end()
+
+
+def is_supported(objs):
+    """ If the native writer can export all of the given objects """
+    if not objs:
+        return False
+    for obj in objs:
+        if obj.type != 'MESH':
+            return False
+        if obj.data.shape_keys or (obj.parent and obj.parent.type == 'ARMATURE'):
+            return False
+        if any(slot.material is None for slot in obj.material_slots):
+            return False
+    return True
+
+def get_mesh_arrays(mesh):
+    """ Reads the mesh buffers needed for export with foreach_get """
+    vertex_count, loop_count, polygon_count = len(mesh.vertices), len(mesh.loops), len(mesh.polygons)
+
+    vertices = np.empty(vertex_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', vertices)
+
+    polygon_vertex_index = np.empty(loop_count, dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', polygon_vertex_index)
+    loop_totals = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+    # the last index of each polygon is stored as bitwise negation
+    polygon_ends = np.cumsum(loop_totals) - 1
+    polygon_vertex_index[polygon_ends] = ~polygon_vertex_index[polygon_ends]
+
+    normals = np.empty(loop_count * 3, dtype=np.float32)
+    if hasattr(mesh, 'corner_normals'):
+        mesh.corner_normals.foreach_get('vector', normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get('normal', normals)
+
+    smoothing = np.empty(polygon_count, dtype=np.bool_)
+    mesh.polygons.foreach_get('use_smooth', smoothing)
+
+    material_indices = np.empty(polygon_count, dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', material_indices)
+
+    uv_layers = []
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty(loop_count * 2, dtype=np.float32)
+        uv_layer.data.foreach_get('uv', uvs)
+        # store unique uvs and index them (usually a lot smaller)
+        unique_uvs, uv_index = np.unique(uvs.reshape(-1, 2), axis=0, return_inverse=True)
+        uv_layers.append((uv_layer.name, unique_uvs.astype(np.float64).ravel(), uv_index.astype(np.int32).ravel()))
+
+    return {
+        'vertices': vertices.astype(np.float64),
+        'polygon_vertex_index': polygon_vertex_index,
+        'normals': normals.astype(np.float64),
+        'smoothing': smoothing.astype(np.int32),
+        'material_indices': material_indices,
+        'uv_layers': uv_layers,
+    }
+
+
+def get_object_arrays(obj, depsgraph):
+    """ Mesh buffers of an object with its modifiers applied """
+    evaluated_object = obj.evaluated_get(depsgraph)
+    mesh = evaluated_object.to_mesh()
+    try:
+        return get_mesh_arrays(mesh)
+    finally:
+        evaluated_object.to_mesh_clear()
+
+
+class _Model():
+    ''' Mesh object to write (its arrays are only read while its geometry is written) '''
+    def __init__(self, uid, obj, materials, axis_matrix):
+        self.uid = uid
+        self.obj = obj
+        self.name = obj.name
+        # all models are written as root objects
+        self.matrix = axis_matrix @ obj.matrix_world
+        self.materials = materials
+
+
+def write_objects(objs, filepath, global_scale=1.0):
+    """ Writes mesh objects to a binary fbx file, streaming one mesh at a time """
+    from bpy_extras.io_utils import axis_conversion
+    axis_matrix = axis_conversion(to_forward=AXIS_FORWARD, to_up=AXIS_UP).to_4x4()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    uid = 1000000
+    models = []
+    material_uids = {}
+    for obj in objs:
+        materials = []
+        for slot in obj.material_slots:
+            if slot.material.name not in material_uids:
+                uid += 1
+                material_uids[slot.material.name] = uid
+            materials.append(slot.material.name)
+        uid += 2
+        models.append(_Model(uid, obj, materials, axis_matrix))
+
+    with open(filepath, 'wb') as file:
+        writer = FBXStreamWriter(file)
+        writer.write_header()
+        _write_header_extension(writer)
+        _write_global_settings(writer)
+        _write_documents(writer)
+        writer.leaf(b'References')
+        _write_definitions(writer, len(models), len(material_uids))
+        writer.begin(b'Objects')
+        for model in models:
+            # the arrays are released before the next mesh is read
+            _write_geometry(writer, model, get_object_arrays(model.obj, depsgraph))
+            _write_model(writer, model, global_scale)
+        for name, material_uid in material_uids.items():
+            _write_material(writer, material_uid, name)
+        writer.end()
+        writer.begin(b'Connections')
+        for model in models:
+            writer.leaf(b'C', string(b'OO'), int64(model.uid), int64(0))
+            writer.leaf(b'C', string(b'OO'), int64(model.uid - 1), int64(model.uid))
+            for name in model.materials:
+                writer.leaf(b'C', string(b'OO'), int64(material_uids[name]), int64(model.uid))
+        writer.end()
+        writer.begin(b'Takes')
+        writer.leaf(b'Current', string(b''))
+        writer.end()
+        writer.write_footer()
+
+def _write_header_extension(writer):
+    writer.begin(b'FBXHeaderExtension')
+    writer.leaf(b'FBXHeaderVersion', int32(1003))
+    writer.leaf(b'FBXVersion', int32(FBX_VERSION))
+    writer.leaf(b'EncryptionType', int32(0))
+    writer.begin(b'CreationTimeStamp')
+    writer.leaf(b'Version', int32(1000))
+    for name, value in ((b'Year', 1970), (b'Month', 1), (b'Day', 1), (b'Hour', 10), (b'Minute', 0), (b'Second', 0), (b'Millisecond', 0)):
+        writer.leaf(name, int32(value))
+    writer.end()
+    writer.leaf(b'Creator', string(b'EZ-UE4 Tools'))
+    writer.end()
+    writer.leaf(b'FileId', raw(_FILE_ID))
+    writer.leaf(b'CreationTime', string(_TIME_ID))
+    writer.leaf(b'Creator', string(b'EZ-UE4 Tools'))
+
+def _write_global_settings(writer):
+    # Y up, -Z forward (AXIS_UP, AXIS_FORWARD), the values the stock exporter writes for them
+    writer.begin(b'GlobalSettings')
+    writer.leaf(b'Version', int32(1000))
+    writer.properties70(
+        (b'UpAxis', b'int', b'Integer', b'', int32(1)),
+        (b'UpAxisSign', b'int', b'Integer', b'', int32(1)),
+        (b'FrontAxis', b'int', b'Integer', b'', int32(2)),
+        (b'FrontAxisSign', b'int', b'Integer', b'', int32(1)),
+        (b'CoordAxis', b'int', b'Integer', b'', int32(0)),
+        (b'CoordAxisSign', b'int', b'Integer', b'', int32(1)),
+        (b'OriginalUpAxis', b'int', b'Integer', b'', int32(-1)),
+        (b'OriginalUpAxisSign', b'int', b'Integer', b'', int32(1)),
+        (b'UnitScaleFactor', b'double', b'Number', b'', float64(1.0)),
+        (b'OriginalUnitScaleFactor', b'double', b'Number', b'', float64(1.0)),
+    )
+    writer.end()
+
+def _write_documents(writer):
+    writer.begin(b'Documents')
+    writer.leaf(b'Count', int32(1))
+    writer.begin(b'Document', int64(1), string(b'Scene'), string(b'Scene'))
+    writer.properties70(
+        (b'SourceObject', b'object', b'', b''),
+        (b'ActiveAnimStackName', b'KString', b'', b'', string(b'')),
+    )
+    writer.leaf(b'RootNode', int64(0))
+    writer.end()
+    writer.end()
+
+def _write_definitions(writer, model_count, material_count):
+    writer.begin(b'Definitions')
+    writer.leaf(b'Version', int32(100))
+    writer.leaf(b'Count', int32(1 + model_count * 2 + material_count))
+    for type_name, count in ((b'GlobalSettings', 1), (b'Model', model_count), (b'Geometry', model_count), (b'Material', material_count)):
+        if count:
+            writer.begin(b'ObjectType', string(type_name))
+            writer.leaf(b'Count', int32(count))
+            writer.end()
+    writer.end()
+
+def _write_geometry(writer, model, arrays):
+    writer.begin(b'Geometry', int64(model.uid - 1), object_name(model.name, b'Geometry'), string(b'Mesh'))
+    writer.properties70()
+    writer.leaf(b'GeometryVersion', int32(124))
+    writer.leaf(b'Vertices', array(arrays['vertices']))
+    writer.leaf(b'PolygonVertexIndex', array(arrays['polygon_vertex_index']))
+
+    writer.begin(b'LayerElementNormal', int32(0))
+    writer.leaf(b'Version', int32(101))
+    writer.leaf(b'Name', string(b''))
+    writer.leaf(b'MappingInformationType', string(b'ByPolygonVertex'))
+    writer.leaf(b'ReferenceInformationType', string(b'Direct'))
+    writer.leaf(b'Normals', array(arrays['normals']))
+    writer.end()
+
+    # smoothing by face, normals are exported so this only avoids import warnings
+    writer.begin(b'LayerElementSmoothing', int32(0))
+    writer.leaf(b'Version', int32(102))
+    writer.leaf(b'Name', string(b''))
+    writer.leaf(b'MappingInformationType', string(b'ByPolygon'))
+    writer.leaf(b'ReferenceInformationType', string(b'Direct'))
+    writer.leaf(b'Smoothing', array(arrays['smoothing']))
+    writer.end()
+
+    for index, (name, uvs, uv_index) in enumerate(arrays['uv_layers']):
+        writer.begin(b'LayerElementUV', int32(index))
+        writer.leaf(b'Version', int32(101))
+        writer.leaf(b'Name', string(name))
+        writer.leaf(b'MappingInformationType', string(b'ByPolygonVertex'))
+        writer.leaf(b'ReferenceInformationType', string(b'IndexToDirect'))
+        writer.leaf(b'UV', array(uvs))
+        writer.leaf(b'UVIndex', array(uv_index))
+        writer.end()
+
+    if model.materials:
+        writer.begin(b'LayerElementMaterial', int32(0))
+        writer.leaf(b'Version', int32(101))
+        writer.leaf(b'Name', string(b''))
+        writer.leaf(b'MappingInformationType', string(b'ByPolygon'))
+        writer.leaf(b'ReferenceInformationType', string(b'IndexToDirect'))
+        writer.leaf(b'Materials', array(arrays['material_indices']))
+        writer.end()
+
+    # layer 0 holds normals, smoothing, materials and the first uv, further uvs get their own layer
+    layer_count = max(1, len(arrays['uv_layers']))
+    for layer in range(layer_count):
+        writer.begin(b'Layer', int32(layer))
+        writer.leaf(b'Version', int32(100))
+        elements = []
+        if layer == 0:
+            elements += [b'LayerElementNormal', b'LayerElementSmoothing']
+            if model.materials:
+                elements.append(b'LayerElementMaterial')
+        if layer < len(arrays['uv_layers']):
+            elements.append(b'LayerElementUV')
+        for element in elements:
+            writer.begin(b'LayerElement')
+            writer.leaf(b'Type', string(element))
+            writer.leaf(b'TypedIndex', int32(layer if element == b'LayerElementUV' else 0))
+            writer.end()
+        writer.end()
+    writer.end()
+
+def _write_model(writer, model, global_scale):
+    location, rotation, scale = model.matrix.decompose()
+    location = location * global_scale
+    scale = scale * global_scale
+    rotation = [np.degrees(angle) for angle in rotation.to_euler('XYZ')]
+
+    writer.begin(b'Model', int64(model.uid), object_name(model.name, b'Model'), string(b'Mesh'))
+    writer.leaf(b'Version', int32(232))
+    writer.properties70(
+        (b'Lcl Translation', b'Lcl Translation', b'', b'A', *[float64(v) for v in location]),
+        (b'Lcl Rotation', b'Lcl Rotation', b'', b'A', *[float64(v) for v in rotation]),
+        (b'Lcl Scaling', b'Lcl Scaling', b'', b'A', *[float64(v) for v in scale]),
+        (b'DefaultAttributeIndex', b'int', b'Integer', b'', int32(0)),
+        (b'InheritType', b'enum', b'', b'', int32(1)),
+    )
+    writer.leaf(b'MultiLayer', int32(0))
+    writer.leaf(b'MultiTake', int32(0))
+    writer.leaf(b'Shading', boolean(True))
+    writer.leaf(b'Culling', string(b'CullingOff'))
+    writer.end()
+
+def _write_material(writer, uid, name):
+    writer.begin(b'Material', int64(uid), object_name(name, b'Material'), string(b''))
+    writer.leaf(b'Version', int32(102))
+    writer.leaf(b'ShadingModel', string(b'Phong'))
+    writer.leaf(b'MultiLayer', int32(0))
+    writer.properties70(
+        (b'DiffuseColor', b'ColorRGB', b'Color', b'', float64(0.8), float64(0.8), float64(0.8)),
+    )
+    writer.end()
@@ -0,0 +1,39 @@
+""" Detection of shared mesh data (linked duplicates) to export them as instances instead of joining them """
+import json
+import math
+import re
+
+def is_instance_candidate(obj):
+    """ If the object shows its mesh data unmodified (modifiers would make every instance unique) """
+    return obj.type == 'MESH' and not obj.modifiers
+
+def find_shared_meshes(objs, min_instances=2):
+    """ Mesh data used by at least min_instances of the objects -> list of those objects """
+    users = {}
+    for obj in objs:
+        if is_instance_candidate(obj):
+            users.setdefault(obj.data, []).append(obj)
+    return {mesh: mesh_objects for mesh, mesh_objects in users.items() if len(mesh_objects) >= min_instances}
+
+def get_mesh_export_name(export_name, mesh):
+    """ Export name of an instanced mesh """
+    return export_name + "_" + re.sub(r"\W", "_", mesh.name)
+
+def get_unreal_transform(obj, unit_scale):
+    """ World transform of an object in unreal space (cm, left handed, rotator in degrees) """
+    location, rotation, scale = obj.matrix_world.decompose()
+    euler = rotation.to_euler('XYZ')
+    return {
+        'name': obj.name,
+        'location': [location.x * unit_scale, -location.y * unit_scale, location.z * unit_scale],
+        'rotation': {'roll': math.degrees(euler.x), 'pitch': -math.degrees(euler.y), 'yaw': -math.degrees(euler.z)},
+        'scale': [scale.x, scale.y, scale.z],
+    }
+
+def write_transforms(path, instances):
+    """ Writes the sidecar of an export (mesh export name -> list of unreal transforms) """
+    data = {'version': 1, 'instances': [
+        {'mesh': mesh_export_name, 'transforms': transforms} for mesh_export_name, transforms in instances.items()
+    ]}
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
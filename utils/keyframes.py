@@ -0,0 +1,221 @@
+""" Keyframe reduction of baked animation curves in binary fbx files
+
+The stock exporter bakes a key for every frame (linear interpolation). The curves
+are reduced in the written file: keys that linear interpolation between the kept
+keys reproduces within an absolute tolerance are dropped, constant curves keep a
+single key. Tolerances are per channel type (translation, rotation in degrees, scale).
+"""
+import os
+import struct
+import zlib
+import numpy as np
+from . import fbx_writer
+
+# header magic and version, nodes start after it
+_HEADER_SIZE = 27
+# fbx files from 7500 on use 64 bit node offsets (the stock exporter writes 7400)
+_MAX_VERSION = 7499
+_NODE_HEADER_SIZE = 13
+
+_SCALAR_SIZES = {b'Y': 2, b'C': 1, b'I': 4, b'F': 4, b'D': 8, b'L': 8}
+_ARRAY_DTYPES = {
+    b'f': np.float32,
+    b'd': np.float64,
+    b'l': np.int64,
+    b'i': np.int32,
+    b'b': np.bool_,
+}
+
+# curve node names of the bone channels
+TRANSLATION = b'T'
+ROTATION = b'R'
+SCALE = b'S'
+
+
+class FBXNode():
+    ''' Node of a parsed fbx file, the properties are kept encoded (as they are written) '''
+    __slots__ = ('name', 'props', 'children')
+
+    def __init__(self, name, props, children):
+        self.name = name
+        self.props = props
+        self.children = children
+
+    def find(self, name):
+        return next((child for child in self.children if child.name == name), None)
+
+
+def _read_props(data, offset, count):
+    props = []
+    for _ in range(count):
+        start = offset
+        type_code = data[offset:offset + 1]
+        offset += 1
+        if type_code in _SCALAR_SIZES:
+            offset += _SCALAR_SIZES[type_code]
+        elif type_code in _ARRAY_DTYPES:
+            offset += 12 + struct.unpack_from('<I', data, offset + 8)[0]
+        elif type_code in (b'S', b'R'):
+            offset += 4 + struct.unpack_from('<I', data, offset)[0]
+        else:
+            raise ValueError(f"Unknown fbx property type {type_code!r}")
+        props.append(bytes(data[start:offset]))
+    return props
+
+def _read_node(data, offset):
+    """ Node at the offset (None at a sentinel) and the offset after it """
+    end, prop_count, props_length, name_length = struct.unpack_from('<IIIB', data, offset)
+    if not end:
+        return None, offset + _NODE_HEADER_SIZE
+    name_start = offset + _NODE_HEADER_SIZE
+    name = bytes(data[name_start:name_start + name_length])
+    props_start = name_start + name_length
+    props = _read_props(data, props_start, prop_count)
+    children = []
+    child_offset = props_start + props_length
+    while child_offset < end:
+        child, child_offset = _read_node(data, child_offset)
+        if child is None:
+            break
+        children.append(child)
+    return FBXNode(name, props, children), end
+
+def read_fbx(filepath):
+    """ Top level nodes of a binary fbx file """
+    with open(filepath, 'rb') as file:
+        data = memoryview(file.read())
+    if bytes(data[:len(fbx_writer._HEAD_MAGIC)]) != fbx_writer._HEAD_MAGIC:
+        raise ValueError("Not a binary fbx file")
+    version = struct.unpack_from('<I', data, 23)[0]
+    if version > _MAX_VERSION:
+        raise ValueError(f"Fbx version {version} is not supported")
+    nodes = []
+    offset = _HEADER_SIZE
+    while offset < len(data):
+        node, offset = _read_node(data, offset)
+        if node is None:
+            break
+        nodes.append(node)
+    return nodes
+
+def _write_node(writer, node):
+    writer.begin(node.name, *node.props)
+    for child in node.children:
+        _write_node(writer, child)
+    writer.end()
+
+def write_fbx(nodes, filepath):
+    """ Writes parsed nodes to a binary fbx file (replaces the file when it is complete) """
+    temp_path = filepath + ".tmp"
+    with open(temp_path, 'wb') as file:
+        writer = fbx_writer.FBXStreamWriter(file)
+        writer.write_header()
+        for node in nodes:
+            _write_node(writer, node)
+        writer.write_footer()
+    os.replace(temp_path, filepath)
+
+def decode_array(prop):
+    """ Numpy array of an encoded array property """
+    length, encoding, size = struct.unpack_from('<III', prop, 1)
+    data = prop[13:13 + size]
+    if encoding:
+        data = zlib.decompress(data)
+    return np.frombuffer(data, dtype=_ARRAY_DTYPES[prop[:1]], count=length)
+
+def decode_int64(prop):
+    return struct.unpack_from('<q', prop, 1)[0]
+
+def decode_string(prop):
+    return prop[5:]
+
+def _fits(times, values, start, end, tolerance):
+    """ If linear interpolation from key start to key end reproduces the keys in between """
+    segment_times = times[start:end + 1]
+    segment_values = values[start:end + 1]
+    blend = (segment_times - segment_times[0]) / (segment_times[-1] - segment_times[0])
+    interpolated = segment_values[0] + (segment_values[-1] - segment_values[0]) * blend
+    return np.abs(interpolated - segment_values).max() <= tolerance
+
+def get_reduced_keys(times, values, tolerance):
+    """ Indices of the keys to keep, a constant curve keeps its first key """
+    count = len(values)
+    times = times.astype(np.float64)
+    values = values.astype(np.float64)
+    if not count or values.max() - values.min() <= tolerance:
+        return np.arange(min(count, 1))
+    keep = [0]
+    start = 0
+    while start < count - 1:
+        # longest segment from start, growing in doubling steps and then halving the step (every accepted segment fits)
+        end = start + 1
+        step = 1
+        while end + step < count and _fits(times, values, start, end + step, tolerance):
+            end += step
+            step *= 2
+        upper = min(end + step, count)
+        while upper - end > 1:
+            middle = (end + upper) // 2
+            if _fits(times, values, start, middle, tolerance):
+                end = middle
+            else:
+                upper = middle
+        keep.append(end)
+        start = end
+    return np.array(keep)
+
+def reduce_curve(curve, tolerance):
+    """ Reduces the keys of an AnimationCurve node, returns the key count before and after """
+    key_times, key_values, ref_counts = curve.find(b'KeyTime'), curve.find(b'KeyValueFloat'), curve.find(b'KeyAttrRefCount')
+    if not (key_times and key_values and ref_counts):
+        return 0, 0
+    times = decode_array(key_times.props[0])
+    values = decode_array(key_values.props[0])
+    # the stock exporter shares one key attribute between all keys
+    if len(decode_array(ref_counts.props[0])) != 1:
+        return len(times), len(times)
+    keep = get_reduced_keys(times, values, tolerance)
+    key_times.props = [fbx_writer.array(times[keep])]
+    key_values.props = [fbx_writer.array(values[keep])]
+    ref_counts.props = [fbx_writer.array(np.array([len(keep)], dtype=np.int32))]
+    return len(times), len(keep)
+
+def get_curve_channels(nodes):
+    """ Channel type (curve node name, eg. T) of each animation curve uid """
+    objects = next((node for node in nodes if node.name == b'Objects'), None)
+    connections = next((node for node in nodes if node.name == b'Connections'), None)
+    if not objects or not connections:
+        return {}
+    curve_node_names = {decode_int64(node.props[0]): decode_string(node.props[1]).split(b'\x00\x01')[0]
+                        for node in objects.children if node.name == b'AnimationCurveNode'}
+    channels = {}
+    for connection in connections.children:
+        # curves are connected to a property (d|X) of their curve node
+        if len(connection.props) < 3 or decode_string(connection.props[0]) != b'OP':
+            continue
+        channel = curve_node_names.get(decode_int64(connection.props[2]))
+        if channel is not None:
+            channels[decode_int64(connection.props[1])] = channel
+    return channels
+
+def reduce_fbx_keys(filepath, tolerances):
+    """ Reduces the animation curves of a baked fbx with {channel: tolerance}, other channels are kept, returns (keys before, keys after) """
+    nodes = read_fbx(filepath)
+    channels = get_curve_channels(nodes)
+    objects = next((node for node in nodes if node.name == b'Objects'), None)
+    keys_before = keys_after = 0
+    for node in (objects.children if objects else ()):
+        if node.name != b'AnimationCurve':
+            continue
+        tolerance = tolerances.get(channels.get(decode_int64(node.props[0])))
+        if tolerance is None:
+            key_times = node.find(b'KeyTime')
+            key_count = len(decode_array(key_times.props[0])) if key_times else 0
+            keys_before += key_count
+            keys_after += key_count
+            continue
+        before, after = reduce_curve(node, tolerance)
+        keys_before += before
+        keys_after += after
+    write_fbx(nodes, filepath)
+    return keys_before, keys_after
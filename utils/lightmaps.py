@@ -0,0 +1,90 @@
+""" Lightmap uv channel generation (so unreal does not have to generate them on import), cached by geometry hash """
+import os
+import bpy
+import numpy as np
+from . import meshes, modes, objects
+from .log import logger
+
+LIGHTMAP_UV_NAME = "Lightmap"
+CACHE_FOLDER = "ezue4_lightmaps"
+# blender meshes can have at most 8 uv layers
+MAX_UV_LAYERS = 8
+
+# export name -> (key, packed uvs), also written to the cache folder to survive restarts
+__lightmap_cache__ = {}
+
+
+def get_cache_path(owner):
+    from ..core import preferences
+    return os.path.join(str(preferences.source_path()), CACHE_FOLDER, owner + ".npz")
+
+def lookup(owner, key, loop_count):
+    """ Cached lightmap uvs of an export (None if the key changed) """
+    cached = __lightmap_cache__.get(owner)
+    if not cached or cached[0] != key:
+        path = get_cache_path(owner)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            cached = (str(data['key']), data['uvs'])
+        if cached[0] != key:
+            return None
+        __lightmap_cache__[owner] = cached
+    uvs = cached[1]
+    return uvs if len(uvs) == loop_count * 2 else None
+
+def store(owner, key, uvs):
+    """ Caches the lightmap uvs of an export in memory and on disk """
+    __lightmap_cache__[owner] = (key, uvs)
+    path = get_cache_path(owner)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, key=np.array(key), uvs=uvs)
+
+def get_uvs(uv_layer):
+    uvs = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get('uv', uvs)
+    return uvs
+
+def pack(obj, uv_layer_name, margin):
+    """ Lightmap packs all faces of the object into the uv layer """
+    mesh = obj.data
+    previous_active = mesh.uv_layers.active_index
+    mesh.uv_layers.active = mesh.uv_layers[uv_layer_name]
+    objects.select_only([obj])
+    objects.set_active(obj)
+    og_mode = obj.mode
+    modes.switch_to_edit()
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.uv.lightmap_pack(PREF_CONTEXT='ALL_FACES', PREF_PACK_IN_ONE=True, PREF_NEW_UVLAYER=False, PREF_MARGIN_DIV=margin)
+    bpy.ops.object.mode_set(mode=og_mode)
+    # texture uvs stay the active (and first) channel
+    mesh.uv_layers.active_index = previous_active
+
+def add_lightmap_uvs(obj, owner, margin=0.1):
+    """ Adds the lightmap uv channel to the mesh of the object, returns its channel index (None if not added) """
+    mesh = obj.data
+    existing = mesh.uv_layers.get(LIGHTMAP_UV_NAME)
+    if existing:
+        # authored by hand
+        logger.info("'%s' already has lightmap uvs", obj.name)
+        return list(mesh.uv_layers).index(existing)
+    if len(mesh.uv_layers) >= MAX_UV_LAYERS:
+        logger.warning("'%s' has no free uv channel for lightmap uvs", obj.name)
+        return None
+    if not mesh.uv_layers:
+        logger.warning("'%s' has no uvs, lightmap uvs would become the texture uvs", obj.name)
+        return None
+
+    # hash before the new channel exists
+    key = f"{meshes.get_geometry_hash(mesh)}|{margin:.4f}"
+    uvs = lookup(owner, key, len(mesh.loops))
+    uv_layer = mesh.uv_layers.new(name=LIGHTMAP_UV_NAME, do_init=False)
+    if uvs is not None:
+        uv_layer.data.foreach_set('uv', uvs)
+        logger.debug("Reusing cached lightmap uvs of '%s'", owner)
+    else:
+        pack(obj, LIGHTMAP_UV_NAME, margin)
+        # layer references do not survive the edit mode round trip
+        store(owner, key, get_uvs(mesh.uv_layers[LIGHTMAP_UV_NAME]))
+        logger.info("Generated lightmap uvs for '%s'", owner)
+    return len(mesh.uv_layers) - 1
@@ -0,0 +1,81 @@
+""" LOD chain generation (decimated copies of the joined mesh) exported as fbx LodGroup """
+import bpy
+from . import meshes
+from .log import logger
+from .mesh_cache import MeshCache
+
+LOD_MODIFIER_NAME = "EZUE4_LOD"
+
+# decimated meshes per export name, keyed by the geometry hash of the source
+__lod_cache__ = MeshCache()
+
+
+def parse_lod_levels(text):
+    """ Parses comma separated levels, values <= 1 are decimate ratios, larger values are triangle budgets """
+    levels = []
+    for value in text.replace(";", ",").split(","):
+        value = value.strip()
+        if not value:
+            continue
+        level = float(value)
+        if level <= 0.0:
+            raise ValueError(f"Invalid LOD level '{value}'")
+        levels.append(level)
+    return levels
+
+def get_ratio(mesh, level):
+    """ Decimate ratio of a level for a mesh """
+    if level <= 1.0:
+        return level
+    return min(1.0, level / max(1, meshes.get_triangle_count(mesh)))
+
+def decimate(obj, ratio):
+    """ New mesh data-block with the decimated geometry of the object """
+    temp = obj.copy()
+    temp.modifiers.clear()
+    modifier = temp.modifiers.new(LOD_MODIFIER_NAME, 'DECIMATE')
+    modifier.ratio = ratio
+    modifier.use_collapse_triangulate = True
+    # has to be in the scene to be evaluated
+    bpy.context.scene.collection.objects.link(temp)
+    try:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        return bpy.data.meshes.new_from_object(temp.evaluated_get(depsgraph))
+    finally:
+        bpy.data.objects.remove(temp, do_unlink=True)
+
+def get_lod_mesh(obj, ratio, owner, source_hash):
+    """ Decimated mesh of the object, reused while the source geometry is unchanged (do not modify, copy it) """
+    key = round(ratio, 6)
+    cached = __lod_cache__.lookup(owner, source_hash, key)
+    if cached:
+        logger.debug("Reusing cached LOD (%s) of '%s'", key, owner)
+        return cached[0]
+    mesh = decimate(obj, ratio)
+    mesh.name = f"{owner}_LOD_{key}"
+    __lod_cache__.store(owner, source_hash, key, [mesh])
+    return mesh
+
+def create_lod_group(obj, levels, name):
+    """ Parents the object (as LOD0) and its generated lods to a LodGroup empty with the name, returns all created objects """
+    source_hash = meshes.get_geometry_hash(obj.data)
+    obj.name = name + "_LOD0"
+    group = bpy.data.objects.new(name, None)
+    # picked up by the fbx exporter
+    group['fbx_type'] = 'LodGroup'
+    for collection in obj.users_collection:
+        collection.objects.link(group)
+
+    lod_objects = [obj]
+    for i, level in enumerate(levels, 1):
+        mesh = get_lod_mesh(obj, get_ratio(obj.data, level), name, source_hash)
+        lod = bpy.data.objects.new(f"{name}_LOD{i}", mesh.copy())
+        for collection in obj.users_collection:
+            collection.objects.link(lod)
+        lod_objects.append(lod)
+
+    for lod in lod_objects:
+        matrix_world = lod.matrix_world.copy() if lod is obj else obj.matrix_world.copy()
+        lod.parent = group
+        lod.matrix_world = matrix_world
+    return [group] + lod_objects
@@ -0,0 +1,104 @@
+""" Leveled logging of the addon with per-run context and an in-memory ring buffer (shown after an export) """
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+LOGGER_NAME = "ezue4"
+BUFFER_SIZE = 500
+FORMAT = "%(levelname)s%(context)s: %(message)s"
+
+# key -> value of the current run (eg. file, collection, action)
+__context__ = {}
+
+
+class ContextFilter(logging.Filter):
+    ''' Adds the run context (eg. [file=..., collection=...]) to every record '''
+
+    def filter(self, record):
+        record.context = " [" + ", ".join(f"{key}={value}" for key, value in __context__.items()) + "]" if __context__ else ""
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    ''' Keeps the last records in memory (formatted only when read) '''
+    records = None
+
+    def __init__(self, capacity=BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        # the message is formatted lazily, but the context has to be captured now
+        self.records.append(record)
+
+    def get_lines(self, level=logging.NOTSET):
+        # first line only (no tracebacks)
+        return [self.format(record).splitlines()[0] for record in self.records if record.levelno >= level]
+
+    def has_records(self, level):
+        return any(record.levelno >= level for record in self.records)
+
+    def clear(self):
+        self.records.clear()
+
+
+logger = logging.getLogger(LOGGER_NAME)
+# do not end up in the log of other addons (root logger)
+logger.propagate = False
+logger.setLevel(logging.INFO)
+# the logger outlives the module (reload scripts, addon disable/enable), replace what an earlier load added
+for handler in list(logger.handlers):
+    logger.removeHandler(handler)
+for old_filter in list(logger.filters):
+    logger.removeFilter(old_filter)
+logger.addFilter(ContextFilter())
+
+buffer = RingBufferHandler()
+buffer.setFormatter(logging.Formatter(FORMAT))
+logger.addHandler(buffer)
+
+console = logging.StreamHandler()
+console.setFormatter(logging.Formatter(FORMAT))
+logger.addHandler(console)
+
+
+def set_verbose(verbose):
+    """ Debug records are only created (and formatted) if verbose """
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+def begin_run(**context):
+    """ Starts the log of an export run (clears the buffer, applies the verbose preference) """
+    from ..core import preferences
+    set_verbose(preferences.verbose_logging())
+    buffer.clear()
+    __context__.clear()
+    __context__.update(context)
+
+@contextmanager
+def context(**values):
+    """ Adds values to the run context while active """
+    previous = dict(__context__)
+    __context__.update(values)
+    try:
+        yield
+    finally:
+        __context__.clear()
+        __context__.update(previous)
+
+def get_lines(level=logging.NOTSET):
+    """ Buffered lines of the last run """
+    return buffer.get_lines(level)
+
+def has_problems():
+    """ If the last run logged warnings or errors """
+    return buffer.has_records(logging.WARNING)
+
+def draw_lines(layout, level=logging.INFO, max_lines=20):
+    """ Draws the last buffered lines """
+    lines = get_lines(level)
+    if not lines:
+        layout.label(text="Nothing logged")
+        return
+    for line in lines[-max_lines:]:
+        icon = 'ERROR' if line.startswith(("ERROR", "WARNING", "CRITICAL")) else 'INFO'
+        layout.label(text=line, icon=icon)
@@ -0,0 +1,197 @@
+""" Manifest of the exported assets and a generated unreal editor script to reimport only the changed ones """
+import hashlib
+import json
+import os
+import struct
+import time
+from .log import logger
+
+MANIFEST_NAME = "ezue4_manifest.json"
+REIMPORT_SCRIPT_NAME = "ezue4_reimport.py"
+
+STATIC_MESH = 'STATIC_MESH'
+SKELETAL_MESH = 'SKELETAL_MESH'
+ANIMATION = 'ANIMATION'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+FBX_MAGIC = b"Kaydara FBX Binary  \x00"
+FBX_HEADER_SIZE = 27
+# top level nodes that differ between two exports of the same content
+FBX_VOLATILE_NODES = {b"FBXHeaderExtension", b"FileId", b"CreationTime", b"Creator"}
+
+REIMPORT_SCRIPT_TEMPLATE = '''""" Generated by EZ-UE4-Tools: reimports the assets changed by the last export (run in the Unreal Editor) """
+import json
+import unreal
+
+ASSETS = json.loads(r"""$(assets)""")
+REMOVED = json.loads(r"""$(removed)""")
+
+
+def create_options(asset):
+    options = unreal.FbxImportUI()
+    options.automated_import_should_detect_type = False
+    options.import_materials = False
+    options.import_textures = False
+    if asset["type"] == "ANIMATION":
+        options.import_mesh = False
+        options.import_animations = True
+        options.mesh_type_to_import = unreal.FBXImportType.FBXIT_ANIMATION
+        options.skeleton = unreal.load_asset(asset["skeleton"])
+    elif asset["type"] == "SKELETAL_MESH":
+        options.import_as_skeletal = True
+        options.import_animations = False
+        options.mesh_type_to_import = unreal.FBXImportType.FBXIT_SKELETAL_MESH
+    else:
+        options.mesh_type_to_import = unreal.FBXImportType.FBXIT_STATIC_MESH
+        options.static_mesh_import_data.combine_meshes = True
+        options.static_mesh_import_data.auto_generate_collision = not asset["ucx"]
+        options.static_mesh_import_data.import_mesh_lods = asset["lods"] > 1
+        options.static_mesh_import_data.generate_lightmap_u_vs = asset["lightmap"] is None
+    return options
+
+
+def set_lightmap_channels():
+    for asset in ASSETS:
+        if asset["type"] != "STATIC_MESH" or asset["lightmap"] is None:
+            continue
+        mesh = unreal.load_asset(asset["destination"] + "/" + asset["name"])
+        if mesh:
+            mesh.set_editor_property("light_map_coordinate_index", asset["lightmap"])
+            unreal.EditorAssetLibrary.save_loaded_asset(mesh)
+
+
+def reimport():
+    tasks = []
+    for asset in ASSETS:
+        task = unreal.AssetImportTask()
+        task.filename = asset["file"]
+        task.destination_path = asset["destination"]
+        task.destination_name = asset["name"]
+        task.replace_existing = True
+        task.automated = True
+        task.save = True
+        task.options = create_options(asset)
+        tasks.append(task)
+    if tasks:
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+        set_lightmap_channels()
+    for name in REMOVED:
+        unreal.log_warning(f"EZ-UE4: source of '{name}' was removed")
+    unreal.log(f"EZ-UE4: reimported {len(tasks)} assets")
+
+
+reimport()
+'''
+
+
+def get_file_hash(path):
+    """ Hash of the file content """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_fbx_hash(path):
+    """ Hash of a binary fbx without the nodes that change on every export (eg. creation time) """
+    with open(path, 'rb') as file:
+        header = file.read(FBX_HEADER_SIZE)
+        if not header.startswith(FBX_MAGIC):
+            return get_file_hash(path)
+        version = struct.unpack('<I', header[23:27])[0]
+        record = struct.Struct('<QQQB' if version >= 7500 else '<IIIB')
+        digest = hashlib.blake2b(digest_size=16)
+        offset = FBX_HEADER_SIZE
+        while True:
+            file.seek(offset)
+            end_offset, _, _, name_length = record.unpack(file.read(record.size))
+            if end_offset == 0:
+                # null record ends the top level nodes (footer follows)
+                return digest.hexdigest()
+            name = file.read(name_length)
+            if name not in FBX_VOLATILE_NODES:
+                file.seek(offset)
+                digest.update(file.read(end_offset - offset))
+            offset = end_offset
+
+def load(directory):
+    """ Manifest of a directory (empty if there is none yet) """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'version': 1, 'assets': {}}
+    with open(path) as file:
+        return json.load(file)
+
+def create_reimport_script(entries, removed, source_directory, content_path):
+    """ Unreal editor python script reimporting the entries (file name -> manifest asset) """
+    assets = []
+    for file_name, entry in entries.items():
+        asset = {
+            'file': os.path.join(source_directory, file_name),
+            'name': os.path.splitext(file_name)[0],
+            'destination': content_path,
+            'type': entry['type'],
+            'ucx': entry['ucx'],
+            'lods': entry['lods'],
+            'lightmap': entry.get('lightmap'),
+        }
+        if entry.get('skeleton'):
+            asset['skeleton'] = content_path + "/" + entry['skeleton']
+        assets.append(asset)
+    script = REIMPORT_SCRIPT_TEMPLATE.replace("$(assets)", json.dumps(assets, indent=2))
+    return script.replace("$(removed)", json.dumps(removed))
+
+
+class ExportManifest():
+    ''' Collects the files written by an export run, write() updates the manifest and the reimport script '''
+    entries = None
+
+    def __init__(self):
+        # file name -> asset entry
+        self.entries = {}
+
+    def add(self, export_path, asset_type, skeleton=None, has_ucx=False, lod_count=1, lightmap_index=None):
+        ''' Records a written fbx (lightmap_index is the uv channel of generated lightmap uvs) '''
+        self.entries[os.path.basename(export_path)] = {
+            'type': asset_type,
+            'skeleton': skeleton,
+            'ucx': has_ucx,
+            'lods': lod_count,
+            'lightmap': lightmap_index,
+        }
+
+    def write(self):
+        ''' Writes manifest and reimport script next to the exported files, returns (added, changed, removed) '''
+        from ..core import preferences
+        directory = str(preferences.source_path())
+        manifest = load(directory)
+        assets = manifest['assets']
+
+        added, changed = [], []
+        for file_name, entry in self.entries.items():
+            path = os.path.join(directory, file_name)
+            if not os.path.exists(path):
+                continue
+            entry = dict(entry, hash=get_fbx_hash(path))
+            previous = assets.get(file_name)
+            if previous is None:
+                added.append(file_name)
+            elif previous != entry:
+                changed.append(file_name)
+            assets[file_name] = entry
+        # written by an earlier run but deleted since
+        removed = sorted(file_name for file_name in assets if not os.path.exists(os.path.join(directory, file_name)))
+        for file_name in removed:
+            del assets[file_name]
+
+        manifest['last_run'] = {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'added': added, 'changed': changed, 'removed': removed}
+        with open(os.path.join(directory, MANIFEST_NAME), 'w') as file:
+            json.dump(manifest, file, indent=2)
+
+        reimport = {file_name: assets[file_name] for file_name in added + changed}
+        script = create_reimport_script(reimport, [os.path.splitext(file_name)[0] for file_name in removed], directory, preferences.unreal_content_path())
+        with open(os.path.join(directory, REIMPORT_SCRIPT_NAME), 'w') as file:
+            file.write(script)
+        logger.info("Manifest: %d added, %d changed, %d removed", len(added), len(changed), len(removed))
+        return added, changed, removed
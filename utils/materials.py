@@ -0,0 +1,45 @@
+""" Material slot handling of joined meshes """
+import numpy as np
+
+def get_material_indices(mesh):
+    """ Material index of every polygon """
+    indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', indices)
+    return indices
+
+def count_sections(obj):
+    """ Number of sections (used material slots) unreal will import """
+    if not obj.material_slots:
+        return 1 if len(obj.data.polygons) else 0
+    return len(np.unique(get_material_indices(obj.data)))
+
+def consolidate_material_slots(obj):
+    """ Merges slots with the same material and removes unused slots, returns the section count (before, after) """
+    mesh = obj.data
+    slot_materials = [slot.material for slot in obj.material_slots]
+    if not slot_materials or not len(mesh.polygons):
+        return count_sections(obj), count_sections(obj)
+
+    indices = np.clip(get_material_indices(mesh), 0, len(slot_materials) - 1)
+    used_slots = np.unique(indices)
+
+    # first slot of each material (in order of the used slots) becomes its section
+    materials = []
+    slot_remap = np.zeros(len(slot_materials), dtype=np.int32)
+    for slot_index in used_slots:
+        material = slot_materials[slot_index]
+        if material not in materials:
+            materials.append(material)
+        slot_remap[slot_index] = materials.index(material)
+
+    if len(materials) == len(slot_materials):
+        # nothing to merge or remove
+        return len(used_slots), len(used_slots)
+
+    new_indices = slot_remap[indices]
+    mesh.materials.clear()
+    for material in materials:
+        mesh.materials.append(material)
+    mesh.polygons.foreach_set('material_index', new_indices)
+    mesh.update()
+    return len(used_slots), len(materials)
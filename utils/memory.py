@@ -0,0 +1,88 @@
+import os
+import sys
+from . import datablocks
+from .log import logger
+
+def get_process_memory():
+    """ Returns the (current, peak) resident memory of the blender process in bytes """
+    if sys.platform == 'win32':
+        return __get_windows_process_memory()
+    current = __get_proc_statm_rss()
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # linux reports kilobytes, macOS bytes
+        if sys.platform != 'darwin':
+            peak *= 1024
+    except ImportError:
+        peak = 0
+    if not current:
+        current = peak
+    return current, max(current, peak)
+
+def __get_proc_statm_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def __get_windows_process_memory():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(PROCESS_MEMORY_COUNTERS)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return 0, 0
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+def format_bytes(size):
+    """ Human readable byte size """
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024.0 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+
+
+# # example usage:
+# with MemoryReport("Export"):
+#   method_that_exports()
+
+class MemoryReport():
+    ''' Utility class to report memory and orphan data-blocks of an export '''
+    title = None
+    rss_before = 0
+    orphans_before = 0
+
+    def __init__(self, title="Export"):
+        self.title = title
+
+    def __enter__(self):
+        ''' Remember memory usage before the export '''
+        self.rss_before, _ = get_process_memory()
+        self.orphans_before = datablocks.count_orphans()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        ''' Print memory usage after the export '''
+        rss_after, rss_peak = get_process_memory()
+        orphans_after = datablocks.count_orphans()
+        logger.info("%s memory: RSS %s -> %s (%s, peak %s), orphan data-blocks %d -> %d",
+                    self.title, format_bytes(self.rss_before), format_bytes(rss_after),
+                    format_bytes(rss_after - self.rss_before), format_bytes(rss_peak), self.orphans_before, orphans_after)
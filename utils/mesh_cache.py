@@ -0,0 +1,51 @@
+""" Cache of generated mesh data-blocks (eg. lods and hulls) that survives between exports """
+import bpy
+from . import datablocks
+
+def is_valid(mesh):
+    """ If the mesh data-block still exists """
+    try:
+        return mesh.name in bpy.data.meshes
+    except ReferenceError:
+        # removed (eg. orphans purged by the user)
+        return False
+
+
+class MeshCache():
+    ''' Generated meshes per owner (export name), kept (protected from purging) while the key of the owner is unchanged '''
+    entries = None
+
+    def __init__(self):
+        # owner -> (key, {sub key: meshes})
+        self.entries = {}
+
+    def lookup(self, owner, key, sub_key):
+        ''' Cached meshes (do not modify, copy them) or None '''
+        entry = self.entries.get(owner)
+        if not entry or entry[0] != key:
+            return None
+        meshes = entry[1].get(sub_key)
+        if meshes is None or not all(is_valid(mesh) for mesh in meshes):
+            return None
+        return meshes
+
+    def store(self, owner, key, sub_key, meshes):
+        ''' Caches the meshes, releases the meshes of an outdated key '''
+        entry = self.entries.get(owner)
+        if not entry or entry[0] != key:
+            self.release(owner)
+            entry = self.entries[owner] = (key, {})
+        for mesh in meshes:
+            datablocks.protect(mesh)
+        entry[1][sub_key] = meshes
+
+    def release(self, owner=None):
+        ''' Removes the cached meshes of an owner (or of all) '''
+        for name in [owner] if owner else list(self.entries):
+            _, cached = self.entries.pop(name, (None, {}))
+            for meshes in cached.values():
+                for mesh in meshes:
+                    if is_valid(mesh):
+                        datablocks.unprotect(mesh)
+                        if not mesh.users:
+                            bpy.data.meshes.remove(mesh)
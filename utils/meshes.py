@@ -0,0 +1,57 @@
+""" Bulk (foreach_get) access to mesh buffers """
+import hashlib
+import numpy as np
+
+def get_polygon_areas(mesh):
+    """ Areas of all polygons """
+    areas = np.empty(len(mesh.polygons), dtype=np.float32)
+    mesh.polygons.foreach_get('area', areas)
+    return areas
+
+def get_edge_face_counts(mesh):
+    """ Number of faces using each edge """
+    edge_indices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('edge_index', edge_indices)
+    return np.bincount(edge_indices, minlength=len(mesh.edges))
+
+def get_uv_layer_names(mesh):
+    """ Names of the uv layers, 'Atlas UVs' is treated as 'UVMap' (resolved when joining) """
+    return tuple("UVMap" if uv_layer.name == "Atlas UVs" else uv_layer.name for uv_layer in mesh.uv_layers)
+
+def get_signature(mesh):
+    """ Cheap signature to detect topology changes of a mesh """
+    return (len(mesh.vertices), len(mesh.edges), len(mesh.polygons), len(mesh.loops), get_uv_layer_names(mesh))
+
+def get_vertex_positions(mesh):
+    """ Vertex positions as (n, 3) array """
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', positions)
+    return positions.reshape(-1, 3)
+
+def get_loop_totals(mesh):
+    """ Number of corners of every polygon """
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', loop_totals)
+    return loop_totals
+
+def get_triangle_count(mesh):
+    """ Number of triangles after triangulation """
+    return int((get_loop_totals(mesh) - 2).sum())
+
+def get_geometry_hash(mesh):
+    """ Hash of everything that ends up in the export (positions, topology, uvs and material indices) """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(get_vertex_positions(mesh).tobytes())
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_vertices)
+    digest.update(loop_vertices.tobytes())
+    digest.update(get_loop_totals(mesh).tobytes())
+    material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', material_indices)
+    digest.update(material_indices.tobytes())
+    for uv_layer in mesh.uv_layers:
+        uvs = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get('uv', uvs)
+        digest.update(uv_layer.name.encode())
+        digest.update(uvs.tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,154 @@
+import logging
+import time
+import bpy
+from contextlib import ExitStack
+from . import addon, log
+from .log import logger
+
+TIMER_INTERVAL = 0.01
+# events still handled by blender while exporting (viewport navigation), anything else is consumed:
+# an undo (or edit) between two steps would invalidate the data the export holds
+PASS_THROUGH_EVENTS = {
+    'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'MIDDLEMOUSE',
+    'TRACKPADPAN', 'TRACKPADZOOM', 'MOUSEROTATE', 'MOUSESMARTZOOM', 'NDOF_MOTION', 'WINDOW_DEACTIVATE',
+}
+
+# the exports share the temporary scene and the export collection, only one may run at a time
+__running__ = False
+
+
+def is_export_running():
+    """ If an export is running (modal exports keep running between timer ticks) """
+    return __running__
+
+def _draw_log_popup(menu, context):
+    log.draw_lines(menu.layout, logging.WARNING)
+
+class ModalExportDriver():
+    ''' Mixin for export operators to run one export step per timer tick (cancellable with Esc)
+
+    Operators implement begin_export(context) returning a list of (label, callable) steps
+    and end_export(context, cancelled). Context managers entered with enter_export_context()
+    are exited after end_export, also when the export got cancelled or failed.
+
+    No undo steps are pushed during the export: operators called from python (the steps)
+    do not push undo, the export operators have no 'UNDO' option and all editing events
+    (including Ctrl+Z / Ctrl+Shift+Z) are consumed while the export runs.
+    '''
+    _timer = None
+    _steps = None
+    _step_index = 0
+    _start_time = 0.0
+    _exit_stack = None
+
+    def run_export(self, context):
+        """ Runs the export modal if there is a window, else blocking (eg. in background mode) """
+        global __running__
+        if __running__:
+            self.report({'WARNING'}, "Another export is running")
+            return {'CANCELLED'}
+        __running__ = True
+        log.begin_run(file=addon.get_project_name())
+        self._exit_stack = ExitStack()
+        self._step_index = 0
+        self._start_time = time.perf_counter()
+        try:
+            self._steps = self.begin_export(context)
+        except Exception as ex:
+            return self._fail(context, ex)
+
+        if bpy.app.background or not context.window or not getattr(self, 'use_modal', True):
+            while self._step_index < len(self._steps):
+                if not self._run_next_step(context):
+                    return {'CANCELLED'}
+            self._finish(context, cancelled=False)
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, max(1, len(self._steps)))
+        self._timer = wm.event_timer_add(TIMER_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def enter_export_context(self, context_manager):
+        """ Enters a context manager that stays active until the export ended """
+        return self._exit_stack.enter_context(context_manager)
+
+    def add_export_callback(self, callback):
+        """ Registers a callback that is called when the export ended (in reverse order) """
+        self._exit_stack.callback(callback)
+
+    def modal(self, context, event):
+        """ Runs the next step on each timer tick """
+        if event.type == 'ESC':
+            self.report({'WARNING'}, "Export cancelled")
+            self._finish(context, cancelled=True)
+            return {'CANCELLED'}
+        if (event.type == 'TIMER' and event.timer != self._timer) or event.type in PASS_THROUGH_EVENTS:
+            return {'PASS_THROUGH'}
+        if event.type != 'TIMER':
+            # keeps undo, redo and edits away from the data the export holds between steps
+            return {'RUNNING_MODAL'}
+
+        if not self._run_next_step(context):
+            return {'CANCELLED'}
+        if self._step_index >= len(self._steps):
+            self._finish(context, cancelled=False)
+            return {'FINISHED'}
+
+        context.window_manager.progress_update(self._step_index)
+        context.workspace.status_text_set(self._get_status_text())
+        return {'PASS_THROUGH'}
+
+    def _get_status_text(self):
+        done, total = self._step_index, len(self._steps)
+        elapsed = time.perf_counter() - self._start_time
+        eta = elapsed / done * (total - done) if done else 0.0
+        label = self._steps[done][0] if done < total else ""
+        return f"EZ-UE4 Export {done}/{total}: {label}  (ETA {eta:.0f}s, Esc to cancel)"
+
+    def _run_next_step(self, context):
+        label, step = self._steps[self._step_index]
+        try:
+            step()
+        except Exception as ex:
+            self._fail(context, ex, label)
+            return False
+        self._step_index += 1
+        return True
+
+    def _fail(self, context, ex, label=None):
+        self.report({'WARNING'}, "Export Failed! See console for more information")
+        logger.exception("Failed to export%s, reason: %s", f" {label}" if label else "", ex)
+        self._finish(context, cancelled=True)
+        return {'CANCELLED'}
+
+    def _finish(self, context, cancelled):
+        """ Ends the export and restores the scene """
+        global __running__
+        wm = context.window_manager
+        if self._timer:
+            wm.event_timer_remove(self._timer)
+            wm.progress_end()
+            self._timer = None
+        if context.workspace:
+            context.workspace.status_text_set(None)
+        try:
+            self.end_export(context, cancelled)
+        finally:
+            try:
+                self._exit_stack.close()
+            finally:
+                __running__ = False
+        if not cancelled:
+            self.report({'INFO'}, f"Export Completed ({time.perf_counter() - self._start_time:.1f}s)")
+            logger.info("Export complete (%.1fs)", time.perf_counter() - self._start_time)
+        if log.has_problems() and context.window and not bpy.app.background:
+            context.window_manager.popup_menu(_draw_log_popup, title="EZ-UE4 Export", icon='ERROR')
+
+    def begin_export(self, context):
+        """ Sets up the export and returns the (label, callable) steps """
+        raise NotImplementedError
+
+    def end_export(self, context, cancelled):
+        """ Cleans up the export """
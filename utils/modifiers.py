@@ -1,6 +1,7 @@
 import bpy
 from . import objects
 from .selection_context import SelectionContext
+from .log import logger
 
 def apply_modifiers(objectList):
     """ Apply all modifiers """
@@ -12,4 +13,4 @@ def apply_modifiers(objectList):
                     try:
                         bpy.ops.object.modifier_apply(modifier=mod.name)
                     except Exception as ex: 
-                        print(f"WARNING: Could not apply modifier {mod.name} of {obj.name}")    
\ No newline at end of file
+                        logger.warning("Could not apply modifier %s of %s", mod.name, obj.name)    
\ No newline at end of file
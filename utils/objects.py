@@ -2,6 +2,7 @@ import bpy
 import os
 from . import modes
 from .selection_context import SelectionContext
+from .log import logger
 
 def add_to_selection(obj):
     """ Sets the object as selected (and not active) """
@@ -23,13 +24,33 @@ def get_active():
     return bpy.context.view_layer.objects.active
 
 def get_selected():
-    return bpy.context.selected_objects
+    """ Selected objects of the view layer (works without a window context, eg. in timers) """
+    return list(bpy.context.view_layer.objects.selected)
 
 def deselect():
-    """ Deselects all active elements """
-    bpy.ops.object.select_all(action='DESELECT')
+    """ Deselects all active elements (only touches the selected objects) """
+    for obj in get_selected():
+        obj.select_set(False)
     bpy.context.view_layer.objects.active = None
 
+def is_in_view_layer(obj):
+    """ If the object (still) exists in the current view layer """
+    try:
+        return obj.name in bpy.context.view_layer.objects
+    except ReferenceError:
+        # object has been removed
+        return False
+
+def select_only(objects_to_select):
+    """ Selects exactly the given objects, only the difference to the current selection is changed """
+    objects_to_select = set(objects_to_select)
+    for obj in get_selected():
+        if obj not in objects_to_select:
+            obj.select_set(False)
+    for obj in objects_to_select:
+        if not obj.select_get():
+            obj.select_set(True)
+
 def find_with_name(name):
     return bpy.context.scene.objects[name]
 
@@ -37,17 +58,17 @@ def set_active_with_name(name):
     set_active(find_with_name(name))
 
 def smooth_normals_of_selected():
-    if bpy.context.selected_objects:
+    if get_selected():
         # make shure we have one object active selected
         if not bpy.context.view_layer.objects.active:
-            set_active(bpy.context.selected_objects[0])
+            set_active(get_selected()[0])
         modes.switch_to_edit()
         bpy.ops.mesh.smooth_normals()
         modes.switch_to_object()
 
 def unselect_none_solid():
     """ Unselect objects that are displayed as bounds or wire (usualy cutter) """
-    for obj in bpy.context.selected_objects:
+    for obj in get_selected():
         if obj and obj.type == 'MESH':
             if obj.display_type == 'WIRE' or obj.display_type == 'BOUNDS':
                 remove_from_selection(obj)
@@ -89,9 +110,21 @@ def find_all_of_type(object_type):
     return objects
 
 
+def has_selected_ancestor(obj, selected):
+    """ If a parent (or its parent...) of the object is in the selected set """
+    parent = obj.parent
+    while parent:
+        if parent in selected:
+            return True
+        parent = parent.parent
+    return False
+
 def unit_scale_selected(unit_scaling):
-    """Scales selected objects to another unit scale"""
-    for obj in bpy.context.selected_objects:
+    """Scales selected objects to another unit scale (selected children are scaled once, with their selected parent)"""
+    selected = set(get_selected())
+    for obj in selected:
+        if has_selected_ancestor(obj, selected):
+            continue
         # multiply location to get offsets right
         obj.location = [obj.location.x * unit_scaling, obj.location.y * unit_scaling, obj.location.z * unit_scaling]
         obj.scale = [obj.scale.x * unit_scaling, obj.scale.y * unit_scaling, obj.scale.z * unit_scaling]
@@ -99,7 +132,7 @@ def unit_scale_selected(unit_scaling):
 def apply_transform_to_selected():
     """Apply tranform to selected objects"""
     current_active = get_active()
-    for obj in bpy.context.selected_objects:
+    for obj in get_selected():
         set_active(obj)
         bpy.ops.object.transform_apply(location=True, rotation=True, scale=True, properties=True)
     if current_active:
@@ -108,7 +141,7 @@ def apply_transform_to_selected():
 def apply_scale_and_rotation_to_selected():
     """Apply tranform to selected objects"""
     current_active = get_active()
-    for obj in bpy.context.selected_objects:
+    for obj in get_selected():
         set_active(obj)
         bpy.ops.object.transform_apply(location=False, rotation=True, scale=True, properties=True)
     if current_active:
@@ -129,7 +162,6 @@ def auto_uv_selected():
 
 def transform_apply_preserve_normals_of_selected(location = False, scale = False, rotation = False):
     """ Applies transform and preserves the normals """
-    print(f"transform_apply_preserved_normals_of_selected")
     with SelectionContext():
         objects_to_flip = []
         if scale:
@@ -160,17 +192,17 @@ def resolve_atlas_uv_from_selected():
     """ Fix names from Decal Machine """
     # renames Atlas UVs so the join dose not break the UVs
     # (when joining all UVs need to have the same name)
-    for obj in bpy.context.selected_objects:
+    for obj in get_selected():
         for uvmap in  obj.data.uv_layers :
             if uvmap.name == "Atlas UVs":
                 uvmap.name = "UVMap"
-                print("UV name missmatch detected and resolved")
+                logger.debug("UV name missmatch of '%s' detected and resolved", obj.name)
 
 def ensure_selection_has_active():
     """Selects the first of the selected objects if none is active"""
-    if not bpy.context.selected_objects or get_active():
+    if not get_selected() or get_active():
         return
-    set_active(bpy.context.selected_objects[0])
+    set_active(get_selected()[0])
 
 def delete(obj):
     """Deletes an object"""
@@ -195,7 +227,7 @@ def smart_join_selected(name = None):
     from . import modifiers
     from ..core import set_selection_priority_object_as_active, unselect_unwanted_objects_for_export
         
-    if not bpy.context.selected_objects:
+    if not get_selected():
         return
 
     unselect_none_solid()
@@ -223,7 +255,7 @@ def smart_join_selected(name = None):
     # join selected objects
     bpy.ops.object.join()
         
-    joined_object = bpy.context.selected_objects[0]
+    joined_object = get_selected()[0]
     if name:
         # rename joined object
         joined_object.name = name
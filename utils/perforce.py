@@ -1,12 +1,14 @@
 import subprocess
 import os
 import bpy
+from functools import lru_cache
 from . import addon
 
+@lru_cache(maxsize=None)
 def is_perforce_installed():
-    '''check if p4 command line tool is installed'''
+    '''check if p4 command line tool is installed (checked once, on first use)'''
     try:
-        subprocess.call(["p4", "info"])
+        subprocess.call(["p4", "info"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except Exception as e:
         return False
     return True
@@ -0,0 +1,125 @@
+""" Export planning (naming, LP/HP filtering, UCX matching and bundles) on plain data
+
+Does not import bpy, so it can be benchmarked outside of Blender (see benchmarks/).
+The operators convert their collections and armatures to plain names and flags and
+use the resulting plan.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+BUNDLE_SUFFIX = '_bundle'
+
+PlanSettings = namedtuple('PlanSettings', (
+    'export_prefix',
+    'collision_prefix',
+    'autouv_prefix',
+    'lowpoly_regex',
+    'highpoly_regex',
+    'collection_name_template',
+    'armature_name_template',
+    'project_name',
+    'export_lp',
+    'export_hp',
+    'export_other',
+    'export_excluded',
+    'export_ucx',
+    'only_dirty',
+    'bundle_children',
+    'force_auto_uv',
+), defaults=(".", "UCX_", "AUV_", "(?i)_lp$", "(?i)_hp$", "$(file)_$(collection)", "$(file)_$(armature)", "",
+             True, True, True, False, True, False, True, False))
+
+# name: collection name, children: names of the child collections
+CollectionInfo = namedtuple('CollectionInfo', ('name', 'children', 'excluded', 'dirty'), defaults=((), False, True))
+
+CollectionPlan = namedtuple('CollectionPlan', ('name', 'export_name', 'ucx_name', 'auto_uv', 'bundle_name', 'bundle_children'))
+ArmaturePlan = namedtuple('ArmaturePlan', ('name', 'export_name'))
+
+
+@lru_cache(maxsize=16)
+def _compile(regex):
+    return re.compile(regex)
+
+def _strip_export_prefixes(name, settings):
+    name = name.removeprefix(settings.export_prefix)
+    return name.removeprefix(settings.autouv_prefix)
+
+def get_export_name(collection_name, settings):
+    """ Export name of a collection """
+    name = settings.collection_name_template.replace("$(collection)", _strip_export_prefixes(collection_name, settings))
+    return name.replace("$(file)", settings.project_name)
+
+def get_bundle_export_name(collection_name, settings):
+    """ Export name of the bundle of the child collections """
+    return get_export_name(collection_name, settings) + BUNDLE_SUFFIX
+
+def get_armature_export_name(armature_name, settings):
+    """ Export name of an armature """
+    name = settings.armature_name_template.replace("$(armature)", armature_name.removeprefix(settings.export_prefix))
+    return name.replace("$(file)", settings.project_name)
+
+def get_ucx_collection_name(collection_name, settings):
+    """ Name the UCX collection of a collection has """
+    return settings.collision_prefix + collection_name.removeprefix(settings.export_prefix)
+
+def is_lowpoly(collection_name, settings):
+    return _compile(settings.lowpoly_regex).search(collection_name) is not None
+
+def is_highpoly(collection_name, settings):
+    return _compile(settings.highpoly_regex).search(collection_name) is not None
+
+def has_auto_uv_prefix(collection_name, settings):
+    return collection_name.startswith(settings.export_prefix + settings.autouv_prefix)
+
+def is_auto_uv(collection_name, settings):
+    """ If a collection is unwrapped after joining """
+    return settings.force_auto_uv or has_auto_uv_prefix(collection_name, settings)
+
+def is_exportable(collection_name, settings):
+    return collection_name.startswith(settings.export_prefix)
+
+def filter_collections(collections, settings):
+    """ Applies the user filter (excluded, modified, LP/HP/Other) to exportable collections """
+    filtered = []
+    for collection in collections:
+        if collection.excluded and not settings.export_excluded:
+            continue
+        if settings.only_dirty and not collection.dirty:
+            continue
+        if is_highpoly(collection.name, settings):
+            if settings.export_hp:
+                filtered.append(collection)
+        elif is_lowpoly(collection.name, settings):
+            if settings.export_lp:
+                filtered.append(collection)
+        elif settings.export_other:
+            filtered.append(collection)
+    return filtered
+
+def plan_collections(collections, collection_names, settings):
+    """ Plans the export of the collections (collection_names are the names of all collections, to find the UCX) """
+    collection_names = collection_names if isinstance(collection_names, (set, frozenset, dict)) else set(collection_names)
+    plans = []
+    for collection in filter_collections(collections, settings):
+        ucx_name = get_ucx_collection_name(collection.name, settings)
+        if not settings.export_ucx or ucx_name not in collection_names:
+            ucx_name = None
+        bundle_name = None
+        bundle_children = ()
+        if settings.bundle_children and collection.children:
+            bundle_name = get_bundle_export_name(collection.name, settings)
+            bundle_children = tuple((child, get_export_name(child, settings)) for child in collection.children)
+        plans.append(CollectionPlan(
+            collection.name,
+            get_export_name(collection.name, settings),
+            ucx_name,
+            is_auto_uv(collection.name, settings),
+            bundle_name,
+            bundle_children,
+        ))
+    return plans
+
+def plan_armatures(armature_names, settings):
+    """ Plans the export of armatures """
+    return [ArmaturePlan(name, get_armature_export_name(name, settings)) for name in armature_names]
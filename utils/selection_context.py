@@ -1,3 +1,4 @@
+import bpy
 from . import objects
 
 class SelectionContext():
@@ -13,8 +14,8 @@ class SelectionContext():
 
     def __exit__(self, type, value, traceback):
         ''' Revert selection to original '''
-        objects.deselect()
-        for obj in self.selected_objects:
-            objects.add_to_selection(obj)
-        if self.active_object:
+        # only objects that still exist can be selected again
+        objects.select_only(obj for obj in self.selected_objects if objects.is_in_view_layer(obj))
+        bpy.context.view_layer.objects.active = None
+        if self.active_object and objects.is_in_view_layer(self.active_object):
             objects.set_active(self.active_object)
\ No newline at end of file
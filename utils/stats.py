@@ -0,0 +1,89 @@
+""" Geometry statistics of the planned exports and per-prefix budgets """
+from collections import namedtuple
+from . import datablocks, meshes
+
+Stats = namedtuple('Stats', ('vertices', 'triangles', 'material_slots', 'uv_channels', 'size'))
+Budget = namedtuple('Budget', ('prefix', 'triangles', 'size'))
+
+EMPTY_STATS = Stats(0, 0, 0, 0, 0)
+
+# estimated fbx bytes (positions and normals are written as doubles)
+VERTEX_BYTES = 3 * 8
+LOOP_BYTES = 4 + 3 * 8
+UV_LOOP_BYTES = 2 * 8 + 4
+POLYGON_BYTES = 4
+
+# mesh identity -> (signature, (vertices, triangles, uv channels, size))
+__mesh_cache__ = {}
+
+
+def get_mesh_stats(mesh):
+    """ Counts of a mesh, cached until its topology changes """
+    identity = datablocks.get_identity(mesh)
+    signature = meshes.get_signature(mesh)
+    cached = __mesh_cache__.get(identity)
+    if cached and cached[0] == signature:
+        return cached[1]
+    uv_channels = len(signature[-1])
+    size = (len(mesh.vertices) * VERTEX_BYTES + len(mesh.loops) * (LOOP_BYTES + uv_channels * UV_LOOP_BYTES)
+            + len(mesh.polygons) * POLYGON_BYTES)
+    result = (len(mesh.vertices), meshes.get_triangle_count(mesh), uv_channels, size)
+    __mesh_cache__[identity] = (signature, result)
+    return result
+
+def get_objects_stats(objs):
+    """ Summed stats of the mesh objects as if joined (materials are counted once) """
+    vertices = triangles = uv_channels = size = 0
+    materials = set()
+    for obj in objs:
+        if obj.type != 'MESH':
+            continue
+        mesh_vertices, mesh_triangles, mesh_uv_channels, mesh_size = get_mesh_stats(obj.data)
+        vertices += mesh_vertices
+        triangles += mesh_triangles
+        uv_channels = max(uv_channels, mesh_uv_channels)
+        size += mesh_size
+        materials.update(slot.material for slot in obj.material_slots)
+    return Stats(vertices, triangles, len(materials), uv_channels, size)
+
+def get_collection_stats(collection):
+    """ Stats of the joined mesh of an export collection """
+    from ..core import preferences
+    exclude_prefix = preferences.export_exclude_object_prefix()
+    return get_objects_stats(obj for obj in collection.all_objects if not obj.name.startswith(exclude_prefix))
+
+def get_armature_stats(armature):
+    """ Stats of the meshes exported with an armature """
+    from . import objects
+    return get_objects_stats(objects.get_children_of(armature))
+
+def parse_budgets(text):
+    """ Parses 'prefix:triangles:megabytes' entries separated by ';' (empty values are unlimited) """
+    budgets = []
+    for entry in text.split(";"):
+        if not entry.strip():
+            continue
+        values = [value.strip() for value in entry.split(":")] + ["", ""]
+        prefix, triangles, megabytes = values[:3]
+        budgets.append(Budget(
+            prefix,
+            int(triangles) if triangles else None,
+            int(float(megabytes) * 1024 * 1024) if megabytes else None,
+        ))
+    return budgets
+
+def find_budget(name, budgets):
+    """ Budget with the longest prefix matching the name (None if there is none) """
+    matching = [budget for budget in budgets if name.startswith(budget.prefix)]
+    return max(matching, key=lambda budget: len(budget.prefix), default=None)
+
+def get_budget_violations(stats, budget):
+    """ Messages of the exceeded limits """
+    violations = []
+    if not budget:
+        return violations
+    if budget.triangles is not None and stats.triangles > budget.triangles:
+        violations.append(f"{stats.triangles} triangles (budget {budget.triangles})")
+    if budget.size is not None and stats.size > budget.size:
+        violations.append(f"~{stats.size / (1024 * 1024):.1f} MB (budget {budget.size / (1024 * 1024):.1f} MB)")
+    return violations
@@ -0,0 +1,195 @@
+""" Export of the images used by exported materials (resized, converted and encoded on a thread pool, outside of bpy) """
+import hashlib
+import json
+import os
+import re
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .log import logger
+
+TEXTURE_FOLDER = "Textures"
+CACHE_NAME = "ezue4_textures.json"
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# zlib default, most of the time is spent in the compression
+PNG_COMPRESSION_LEVEL = 6
+# png color types by channel count
+PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+# images waiting for or being converted by a worker (each holds its float buffer until it is written)
+MAX_PENDING = 4
+# color spaces of data (not color) images, their float pixels are written as they are
+DATA_COLORSPACES = {'Non-Color'}
+
+
+def iter_node_tree_images(node_tree, visited=None):
+    """ Images of the image texture nodes (also inside node groups) """
+    visited = set() if visited is None else visited
+    if not node_tree or node_tree in visited:
+        return
+    visited.add(node_tree)
+    for node in node_tree.nodes:
+        if node.type == 'TEX_IMAGE' and node.image:
+            yield node.image
+        elif node.type == 'GROUP':
+            yield from iter_node_tree_images(node.node_tree, visited)
+
+def collect_images(objs):
+    """ Images used by the materials of the objects (each once) """
+    images = {}
+    visited = set()
+    for obj in objs:
+        for slot in getattr(obj, 'material_slots', ()):
+            material = slot.material
+            if not material or material in visited or not material.use_nodes:
+                continue
+            visited.add(material)
+            for image in iter_node_tree_images(material.node_tree):
+                if image.type == 'IMAGE':
+                    images[image.name] = image
+    return list(images.values())
+
+def get_export_name(image):
+    """ File name (without extension) of an exported image """
+    return re.sub(r'[^\w\-]', "_", os.path.splitext(image.name)[0])
+
+def get_source_key(image):
+    """ Cheap identity of the image content (file stats or packed data hash), None if it has to be read """
+    if image.is_dirty:
+        # painted and not saved
+        return None
+    if image.packed_file:
+        return hashlib.blake2b(image.packed_file.data, digest_size=16).hexdigest()
+    if image.source == 'FILE' and image.filepath:
+        import bpy
+        path = bpy.path.abspath(image.filepath, library=image.library)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+    return None
+
+def read_pixels(image):
+    """ Pixels as (height, width, channels) float array, top row first (must run on the main thread) """
+    width, height = image.size
+    channels = image.channels
+    pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(height, width, channels)[::-1]
+
+def is_linear_color(image):
+    """ If the pixels of the image are scene linear color (float buffers), which has to be encoded to sRGB for a png """
+    return image.is_float and image.colorspace_settings.name not in DATA_COLORSPACES
+
+def linear_to_srgb(pixels):
+    """ sRGB transfer function on the color channels (alpha stays linear) """
+    color = np.clip(pixels[:, :, :3], 0.0, 1.0)
+    encoded = np.where(color <= 0.0031308, color * 12.92, 1.055 * np.power(color, 1.0 / 2.4) - 0.055)
+    return np.concatenate((encoded, pixels[:, :, 3:]), axis=2) if pixels.shape[2] > 3 else encoded
+
+def resize(pixels, max_size):
+    """ Downscales so the larger side is at most max_size (box filter for integer factors, else nearest) """
+    height, width = pixels.shape[:2]
+    largest = max(height, width)
+    if not max_size or largest <= max_size:
+        return pixels
+    factor = largest / max_size
+    step = int(factor)
+    if step == factor and height % step == 0 and width % step == 0:
+        return pixels.reshape(height // step, step, width // step, step, -1).mean(axis=(1, 3))
+    new_height, new_width = max(1, round(height / factor)), max(1, round(width / factor))
+    rows = (np.arange(new_height) * height // new_height)
+    columns = (np.arange(new_width) * width // new_width)
+    return pixels[rows][:, columns]
+
+def to_bytes(pixels):
+    """ Float pixels to 8 bit, drops an opaque alpha channel """
+    if pixels.shape[2] == 4 and (pixels[:, :, 3] >= 1.0).all():
+        pixels = pixels[:, :, :3]
+    return (np.clip(pixels, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+def _png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+def encode_png(pixels):
+    """ 8 bit (height, width, channels) array as png """
+    height, width, channels = pixels.shape
+    rows = pixels.reshape(height, width * channels)
+    # 'up' filter (difference to the row above) compresses much better than none
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 0] = 0
+    filtered[0, 1:] = rows[0]
+    filtered[1:, 1:] = rows[1:] - rows[:-1]
+    header = struct.pack('>IIBBBBB', width, height, 8, PNG_COLOR_TYPES[channels], 0, 0, 0)
+    return (PNG_SIGNATURE + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'IDAT', zlib.compress(filtered.tobytes(), PNG_COMPRESSION_LEVEL)) + _png_chunk(b'IEND', b''))
+
+def convert_and_write(pixels, path, max_size, srgb):
+    """ Resizes, encodes (to sRGB if linear color) and writes float pixels (runs on a worker thread, no bpy access) """
+    pixels = resize(pixels, max_size)
+    if srgb and pixels.shape[2] >= 3:
+        pixels = linear_to_srgb(pixels)
+    data = encode_png(to_bytes(pixels))
+    with open(path, 'wb') as file:
+        file.write(data)
+    return len(data)
+
+def load_cache(directory):
+    path = os.path.join(directory, CACHE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def save_cache(directory, cache):
+    with open(os.path.join(directory, CACHE_NAME), 'w') as file:
+        json.dump(cache, file, indent=2)
+
+def export_images(images, directory, max_size=0, max_workers=None):
+    """ Writes the images as png, skips images whose source and settings did not change, returns (written, skipped) """
+    os.makedirs(directory, exist_ok=True)
+    cache = load_cache(directory)
+    # 'srgb': float images are encoded (files written before were linear)
+    settings = {'format': 'PNG', 'max_size': max_size, 'srgb': True}
+    # more workers than pending images would idle
+    max_workers = max_workers or min(os.cpu_count() or 1, MAX_PENDING)
+    written = skipped = 0
+
+    def finish(job):
+        nonlocal written
+        file_name, source_key, future = job
+        try:
+            size = future.result()
+        except Exception as ex:
+            logger.error("Failed to write texture '%s': %s", file_name, ex)
+            return
+        written += 1
+        logger.debug("Wrote texture '%s' (%d bytes)", file_name, size)
+        if source_key:
+            cache[file_name] = {'source': source_key, **settings}
+        else:
+            cache.pop(file_name, None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for image in images:
+            file_name = get_export_name(image) + ".png"
+            path = os.path.join(directory, file_name)
+            source_key = get_source_key(image)
+            if source_key and cache.get(file_name) == {'source': source_key, **settings} and os.path.exists(path):
+                skipped += 1
+                continue
+            # reading the pixels loads the image (only possible on the main thread)
+            if not image.size[0] or not image.size[1]:
+                logger.warning("Image '%s' has no data, not exported", image.name)
+                continue
+            pending.append((file_name, source_key, pool.submit(convert_and_write, read_pixels(image), path, max_size, is_linear_color(image))))
+            # limits the pixel buffers kept in memory (independent of the core count)
+            if len(pending) >= MAX_PENDING:
+                finish(pending.popleft())
+        while pending:
+            finish(pending.popleft())
+
+    save_cache(directory, cache)
+    return written, skipped
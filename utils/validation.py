@@ -0,0 +1,118 @@
+""" Pre-export validation of the export plan (fails before anything is joined or written) """
+import logging
+from collections import namedtuple
+from . import datablocks, meshes
+from .log import logger
+
+ERROR = 'ERROR'
+WARNING = 'WARNING'
+
+Issue = namedtuple('Issue', ('level', 'owner', 'message'))
+
+# polygons smaller than this are treated as zero-area
+ZERO_AREA = 1e-10
+
+# mesh identity -> (signature, result)
+__mesh_cache__ = {}
+
+
+def get_mesh_result(mesh):
+    """ Validation data of a mesh, cached until the mesh changes """
+    identity = datablocks.get_identity(mesh)
+    signature = meshes.get_signature(mesh)
+    cached = __mesh_cache__.get(identity)
+    if cached and cached[0] == signature:
+        return cached[1]
+    edge_face_counts = meshes.get_edge_face_counts(mesh)
+    result = {
+        'uv_layer_names': signature[-1],
+        'zero_area_faces': int((meshes.get_polygon_areas(mesh) < ZERO_AREA).sum()),
+        'non_manifold_edges': int((edge_face_counts != 2).sum()),
+    }
+    __mesh_cache__[identity] = (signature, result)
+    return result
+
+def invalidate_mesh(mesh):
+    """ Forget the cached validation of a mesh (eg. geometry changed without topology change) """
+    __mesh_cache__.pop(datablocks.get_identity(mesh), None)
+
+def validate_collection(collection, ucx_collection=None, auto_uv=False):
+    """ Validates the objects that get joined (and the ucx hulls) of an export collection """
+    from ..core import preferences
+    issues = []
+    owner = collection.name
+    mesh_objects = [obj for obj in collection.all_objects
+                    if obj.type == 'MESH' and not obj.name.startswith(preferences.export_exclude_object_prefix())]
+
+    texture_uv_names = set()
+    for obj in mesh_objects:
+        result = get_mesh_result(obj.data)
+        if result['uv_layer_names']:
+            texture_uv_names.add(result['uv_layer_names'][0])
+        elif not auto_uv:
+            issues.append(Issue(WARNING, owner, f"'{obj.name}' has no UV layer"))
+        if result['zero_area_faces']:
+            issues.append(Issue(WARNING, owner, f"'{obj.name}' has {result['zero_area_faces']} zero-area faces"))
+    # join merges uv layers by name, differently named texture uvs end up in separate channels
+    # (further layers may differ, eg. a lightmap channel on some objects only)
+    if len(texture_uv_names) > 1 and not auto_uv:
+        issues.append(Issue(WARNING, owner, f"First UV layer names do not match ({', '.join(sorted(texture_uv_names))})"))
+
+    if ucx_collection:
+        for obj in ucx_collection.all_objects:
+            if obj.type != 'MESH':
+                continue
+            result = get_mesh_result(obj.data)
+            if result['non_manifold_edges']:
+                issues.append(Issue(ERROR, owner, f"UCX '{obj.name}' is not closed ({result['non_manifold_edges']} non-manifold edges)"))
+    return issues
+
+def validate_armature(armature, with_actions=True):
+    """ Validates an export armature """
+    from . import armatures
+    issues = []
+    root_bone_count = armatures.get_root_bone_count(armature)
+    if root_bone_count > 1:
+        issues.append(Issue(ERROR, armature.name, f"'{armature.name}' has more than one root bone ({root_bone_count})"))
+    if with_actions and not armatures.get_actions_cached(armature):
+        issues.append(Issue(WARNING, armature.name, f"'{armature.name}' has no actions"))
+    return issues
+
+def validate_budgets(assets):
+    """ Validates (owner, name, get_stats) of assets against the budget of their prefix, returns (issues, refused owners)
+
+    Over budget assets are warnings, with the 'REFUSE' preference their owners are returned to be left out of the export.
+    """
+    from ..core import preferences
+    from . import stats
+    try:
+        budgets = stats.parse_budgets(preferences.export_budgets())
+    except ValueError as ex:
+        return [Issue(ERROR, "Preferences", f"Invalid export budgets ({ex})")], set()
+    refuse = preferences.over_budget_action() == 'REFUSE'
+    issues = []
+    refused = set()
+    for owner, name, get_stats in assets:
+        budget = stats.find_budget(name, budgets)
+        if not budget:
+            # stats are only computed for assets with a budget
+            continue
+        violations = stats.get_budget_violations(get_stats(), budget)
+        if not violations:
+            continue
+        if refuse:
+            refused.add(owner)
+        suffix = ", not exported" if refuse else ""
+        issues += [Issue(WARNING, owner, f"'{name}' is over budget: {violation}{suffix}") for violation in violations]
+    return issues, refused
+
+def report_issues(operator, issues, title="Preflight"):
+    """ Prints all issues and reports a summary, returns False if there are errors """
+    for issue in issues:
+        logger.log(logging.ERROR if issue.level == ERROR else logging.WARNING, "[%s] %s", issue.owner, issue.message)
+    errors = [issue for issue in issues if issue.level == ERROR]
+    if errors:
+        operator.report({'ERROR'}, f"{title} failed: {errors[0].message} ({len(errors)} errors, see console)")
+    elif issues:
+        operator.report({'WARNING'}, f"{title}: {len(issues)} warnings, see console")
+    return not errors
@@ -0,0 +1,85 @@
+""" Welding of coincident vertices (eg. at the seams of joined kit pieces) """
+import numpy as np
+from . import meshes
+
+# a cell and the 13 neighbour cells in the positive half space (the other half is covered from the other side)
+NEIGHBOUR_OFFSETS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1) if (x, y, z) >= (0, 0, 0)], dtype=np.int64)
+
+def _as_keys(cells):
+    # rows as sortable (lexicographic) scalars
+    return np.ascontiguousarray(cells).view([('x', np.int64), ('y', np.int64), ('z', np.int64)]).ravel()
+
+def find_weld_pairs(positions, distance):
+    """ All vertex pairs (i, j) within distance, searched in the neighbouring cells of a grid with the distance as cell size """
+    cells = np.floor(positions / distance).astype(np.int64)
+    cell_keys, cell_index, counts = np.unique(_as_keys(cells), return_inverse=True, return_counts=True)
+    cell_index = cell_index.ravel()
+    # vertices sorted by cell, each cell is the range starts[c]:starts[c] + counts[c]
+    order = np.argsort(cell_index, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    unique_cells = cell_keys.view(np.int64).reshape(-1, 3)
+
+    first_indices, second_indices = [], []
+    for offset in NEIGHBOUR_OFFSETS:
+        neighbour_keys = _as_keys(unique_cells + offset)
+        found = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        cells_a = np.nonzero(cell_keys[found] == neighbour_keys)[0]
+        cells_b = found[cells_a]
+        # every vertex of cell a with every vertex of cell b
+        sizes = counts[cells_a] * counts[cells_b]
+        pair_cell = np.repeat(np.arange(len(cells_a)), sizes)
+        local = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        count_b = counts[cells_b][pair_cell]
+        first = order[starts[cells_a][pair_cell] + local // count_b]
+        second = order[starts[cells_b][pair_cell] + local % count_b]
+        keep = np.linalg.norm(positions[first] - positions[second], axis=1) <= distance
+        if not offset.any():
+            # same cell, each pair once
+            keep &= first < second
+        first_indices.append(first[keep])
+        second_indices.append(second[keep])
+    return np.concatenate(first_indices), np.concatenate(second_indices)
+
+def find_weld_targets(positions, distance):
+    """ Maps every vertex to the vertex it is welded to (itself if none), vertices connected by pairs within distance are welded to the lowest index """
+    count = len(positions)
+    if not count or distance <= 0.0:
+        return np.arange(count)
+    # exact duplicates are searched once (a cell full of them would create count^2 pairs)
+    unique_positions, unique_first, unique_index = np.unique(positions, axis=0, return_index=True, return_inverse=True)
+    unique_index = unique_index.ravel()
+    labels = np.arange(len(unique_positions))
+    first, second = find_weld_pairs(unique_positions, distance)
+    # connected components by propagating the lowest label (with pointer jumping)
+    while len(first):
+        updated = labels.copy()
+        np.minimum.at(updated, first, labels[second])
+        np.minimum.at(updated, second, labels[first])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    # lowest vertex index of each component
+    component_targets = np.full(len(unique_positions), count)
+    np.minimum.at(component_targets, labels[unique_index], np.arange(count))
+    return component_targets[labels[unique_index]]
+
+def weld_mesh(mesh, distance):
+    """ Merges vertices within distance, returns the number of removed vertices """
+    import bmesh
+    targets = find_weld_targets(meshes.get_vertex_positions(mesh), distance)
+    welded = np.nonzero(targets != np.arange(len(targets)))[0]
+    if not len(welded):
+        return 0
+
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        verts = bm.verts
+        bmesh.ops.weld_verts(bm, targetmap={verts[i]: verts[targets[i]] for i in welded})
+        bm.to_mesh(mesh)
+    finally:
+        bm.free()
+    mesh.update()
+    return len(welded)